@@ -9,6 +9,8 @@ ETF 유니버스 정의
 
 참고: docs/ETF_SELECTION_CRITERIA.md
 """
+import os
+from pathlib import Path
 
 # ============================================
 # Tier 1: 시장 지수 (Phase 2 구현 예정)
@@ -103,4 +105,50 @@ VOLUME_SPIKE_THRESHOLDS = {
 LOOKBACK_DAYS = 252      # 1년 (트레이딩 일수)
 MA_PERIOD = 20           # 20일 이동평균
 EVENT_HISTORY_DAYS = 30  # 최근 30일 이벤트 추적
+FEATURE_ENGINE = "panel" # 거래량 특성 계산 엔진 (panel | groupby)
+LIVE_STATE_PERIOD = "3mo"  # 빠른 스캔 증분 상태 초기화 히스토리 (MA_PERIOD + 1봉 이상)
 
+# 데이터 수집 설정
+FETCH_MAX_WORKERS = 8    # fetch_multiple 동시 다운로드 스레드 수
+CACHE_TTL_SECONDS = 300  # 메모리 캐시 유효 시간 (5분)
+CACHE_MAX_ENTRIES = 256  # 메모리 캐시 최대 항목 수
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # 메모리 캐시 최대 크기 (256MB)
+RESULT_CACHE_MAX_ENTRIES = 32  # 분석 결과 캐시 최대 항목 수
+# OHLCV 데이터 소스: yfinance | replay (REPLAY_DATA_DIR 파일 재생) | synthetic (합성 데이터)
+DATA_SOURCE = os.getenv("DATA_SOURCE", "yfinance")
+# 경로 환경변수의 상대 경로는 실행 위치(app/ 등)와 무관하게 저장소 루트 기준
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _repo_path(value: str) -> str:
+    """상대 경로 → 저장소 루트 기준 절대 경로 (빈 문자열은 그대로)"""
+    if not value or Path(value).is_absolute():
+        return value
+    return str(REPO_ROOT / value)
+
+
+REPLAY_DATA_DIR = _repo_path(os.getenv("REPLAY_DATA_DIR", ""))
+# OHLCV 로컬 저장소 경로 (빈 문자열이면 디스크 저장 비활성화)
+OHLCV_STORE_DIR = _repo_path(os.getenv(
+    "OHLCV_STORE_DIR",
+    str(REPO_ROOT / "app" / "data" / "ohlcv")
+))
+
+# 서버 설정
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "8"))           # 분석 작업 동시 실행 스레드 수
+WORKER_QUEUE_LIMIT = int(os.getenv("WORKER_QUEUE_LIMIT", "32"))  # 대기 작업 한도 (초과 시 503)
+MAX_BATCH_TICKERS = 50  # /api/tickers 한 번에 조회할 최대 티커 수
+
+# 프로세스 샤딩 (대규모 유니버스 전체 분석을 티커 구간별로 여러 프로세스에서 실행)
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS") or os.cpu_count() or 1)  # 분석 프로세스 수 (빈 값이면 CPU 코어 수)
+SHARD_MIN_TICKERS = int(os.getenv("SHARD_MIN_TICKERS") or 500)  # 이 개수 이상이면 자동 샤딩 (0이면 비활성화)
+
+# 백그라운드 갱신 (빠른 스캔/섹터/전체 분석 사전 계산)
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "1") == "1"
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "300"))                      # 장중 갱신 주기 (초)
+REFRESH_OFF_HOURS_INTERVAL = int(os.getenv("REFRESH_OFF_HOURS_INTERVAL", "3600"))  # 장외 갱신 주기 (초)
+
+# HTTP 응답 캐시 (ETag / 압축 본문)
+RESPONSE_CACHE_MAX_ENTRIES = 128
+RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+COMPRESS_MIN_BYTES = 1024  # 이 크기 이상 본문만 gzip/brotli 압축
@@ -0,0 +1,15 @@
+"""
+pandas 전역 옵션
+앱/벤치마크/샤드 워커 프로세스 시작 시 한 번 호출
+"""
+import pandas as pd
+
+
+def configure_pandas() -> None:
+    """
+    pandas 3 미만에서도 Copy-on-Write 사용 (3.0부터 기본 동작)
+
+    캐시된 DataFrame을 슬라이스/필터해서 컬럼을 추가해도 원본이 바뀌지 않으므로 방어적 .copy()가 필요 없다
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
@@ -1,11 +1,12 @@
-from fastapi import FastAPI, Body
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Body, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import json
 import sys
-import pandas as pd
+from typing import Optional
 
 # 현재 디렉토리를 Python path에 추가
 sys.path.insert(0, str(Path(__file__).parent))
@@ -13,11 +14,38 @@ sys.path.insert(0, str(Path(__file__).parent))
 # 환경 변수 로드
 load_dotenv()
 
+from config.pandas_options import configure_pandas
+configure_pandas()
+
 from models.etf_analyzer import ETFAnalyzer
 from models.sector_aggregator import SectorAggregator
 from services.llm import explain
+from services.serialization import JSONBytesResponse
+from services.executor import PoolSaturated, WorkerPool
+from services.scheduler import RefreshScheduler
+from services.live_feed import LiveFeed
+from services.http_cache import ResponseCache
+from services import metrics
+from config.etf_universe import (
+    ALL_ETFS, SECTOR_ETFS,
+    WORKER_THREADS, WORKER_QUEUE_LIMIT,
+    REFRESH_ENABLED, REFRESH_INTERVAL, REFRESH_OFF_HOURS_INTERVAL,
+    MAX_BATCH_TICKERS, CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, COMPRESS_MIN_BYTES
+)
+
+# 동기 수집/분석 작업 실행 풀 (이벤트 루프 블로킹 방지)
+worker_pool = WorkerPool(max_workers=WORKER_THREADS, max_queue=WORKER_QUEUE_LIMIT)
 
-app = FastAPI(title="VolumeQuant Lite", version="0.2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if REFRESH_ENABLED:
+        await scheduler.start()
+    yield
+    await scheduler.stop()
+    worker_pool.shutdown()
+    analyzer.shutdown()
+
+app = FastAPI(title="VolumeQuant Lite", version="0.2.0", lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -31,21 +59,96 @@ STATIC_DIR = Path(__file__).parent / "static"
 analyzer = ETFAnalyzer()
 sector_aggregator = SectorAggregator()
 
+# 기본 파라미터 요청용 사전 계산 결과 (lifespan에서 시작)
+DEFAULT_FULL_PERIOD = "1y"
+DEFAULT_SECTOR_PERIOD = "5d"
+
+# 직렬화/압축된 응답 본문 캐시 (ETag, If-None-Match → 304)
+http_cache = ResponseCache(
+    ttl=CACHE_TTL_SECONDS,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    min_size=COMPRESS_MIN_BYTES
+)
+
+def _busy_response() -> JSONResponse:
+    """작업 풀 포화 시 503 응답"""
+    return JSONResponse(
+        content={
+            "error": True,
+            "message": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하세요.",
+            "timestamp": __import__('datetime').datetime.now().isoformat()
+        },
+        status_code=503,
+        headers={"Retry-After": "5"}
+    )
+
+async def _cached_json(request: Request, key, compute, *args, **kwargs):
+    """
+    캐시된 본문이 있으면 계산 없이 응답, 없으면 작업 풀에서 계산 + 직렬화
+    
+    Args:
+        key: 응답 내용을 결정하는 값 (데이터 버전 포함, None이면 캐시하지 않음)
+        compute: 결과 계산 함수 (None 반환 시 이 함수도 None 반환)
+    """
+    entry = http_cache.lookup(key)
+    if entry is not None:
+        response = http_cache.respond_cached(request, entry, allow_compress=False)
+        if response is None:
+            # 압축본이 캐시에 없으면 압축도 이벤트 루프 밖에서
+            response = await worker_pool.run(http_cache.respond_cached, request, entry)
+        return response
+    
+    result = await worker_pool.run(compute, *args, **kwargs)
+    if result is None:
+        return None
+    return await worker_pool.run(http_cache.render, request, key, result)
+
+def _version_key(endpoint: str, tickers: list, period: str, *params):
+    """다운로드 없이 응답 가능한 경우의 캐시 키 (데이터 버전 포함, 아니면 None)"""
+    version = analyzer.collector.fresh_version(tickers, period)
+    return None if version is None else (endpoint, tuple(tickers), period, *params, version)
+
 @app.get("/")
 def serve_index():
     return FileResponse(STATIC_DIR / "index.html")
 
 @app.get("/api/analysis/full")
-async def api_full_analysis(tickers: str = None, period: str = "1y"):
+async def api_full_analysis(
+    request: Request,
+    tickers: str = None,
+    period: str = "1y",
+    timings: bool = False
+):
     """
     전체 ETF 거래량 분석
     ?tickers=XLK,XLF,XLE 형태로 특정 티커 지정 가능
     ?period=1y, 6mo, 3mo 등 기간 지정 가능
+    ?timings=true metadata.timings에 단계별 소요 시간(ms) 포함 (사전 계산/응답/결과 캐시 미사용)
     """
     try:
         ticker_list = tickers.split(',') if tickers else None
-        result = analyzer.run_full_pipeline(tickers=ticker_list, period=period)
-        return JSONResponse(result)
+        if timings:
+            return await _cached_json(
+                request, None,
+                analyzer.run_full_pipeline, tickers=ticker_list, period=period, include_timings=True
+            )
+        
+        snapshot = None
+        if ticker_list is None and period == DEFAULT_FULL_PERIOD:
+            snapshot = scheduler.get('full')
+        
+        if snapshot is not None:
+            key = ('full', 'snapshot', scheduler.version('full'))
+            return await _cached_json(request, key, lambda: snapshot)
+        
+        key = _version_key('full', ticker_list or list(ALL_ETFS.keys()), period)
+        return await _cached_json(
+            request, key,
+            analyzer.run_full_pipeline, tickers=ticker_list, period=period
+        )
+    except PoolSaturated:
+        return _busy_response()
     except Exception as e:
         return JSONResponse(
             content={
@@ -64,8 +167,12 @@ async def api_quick_scan(tickers: str = None):
     """
     try:
         ticker_list = tickers.split(',') if tickers else None
-        result = analyzer.quick_scan(tickers=ticker_list)
-        return JSONResponse(result)
+        result = scheduler.get('quick') if ticker_list is None else None
+        if result is None:
+            result = await worker_pool.run(analyzer.quick_scan, tickers=ticker_list)
+        return JSONBytesResponse(result)
+    except PoolSaturated:
+        return _busy_response()
     except Exception as e:
         return JSONResponse(
             content={
@@ -76,25 +183,56 @@ async def api_quick_scan(tickers: str = None):
             status_code=500
         )
 
+def _sector_summary(period: str) -> dict:
+    """섹터 집계 (작업 풀에서 실행)"""
+    # 섹터 ETF 데이터 수집
+    tickers = list(SECTOR_ETFS.keys())
+    
+    # 데이터 수집 및 분석 (티커별 특성 캐시 공유)
+    df = analyzer.session(tickers, period).get('features')
+    
+    # 섹터 집계
+    return sector_aggregator.get_sector_summary(df)
+
+def _sector_history(period: str, days: int) -> dict:
+    """섹터 시그널 시계열 (작업 풀에서 실행)"""
+    tickers = list(SECTOR_ETFS.keys())
+    
+    df = analyzer.session(tickers, period).get('features')
+    return sector_aggregator.get_signal_history(df, days=days)
+
+# 장중 REFRESH_INTERVAL, 장외 REFRESH_OFF_HOURS_INTERVAL 주기로 사전 계산
+scheduler = RefreshScheduler(
+    jobs={
+        'quick': analyzer.quick_scan,
+        'sectors': lambda: _sector_summary(DEFAULT_SECTOR_PERIOD),
+        'full': lambda: analyzer.run_full_pipeline(period=DEFAULT_FULL_PERIOD),
+    },
+    runner=worker_pool.run,
+    interval=REFRESH_INTERVAL,
+    off_hours_interval=REFRESH_OFF_HOURS_INTERVAL
+)
+
+# 게시된 빠른 스캔/섹터 결과의 변경분을 /api/stream 구독자에게 전파
+live_feed = LiveFeed()
+scheduler.add_listener(live_feed.on_publish)
+
 @app.get("/api/sectors")
-async def api_sectors(period: str = "5d"):
+async def api_sectors(request: Request, period: str = "5d"):
     """
     섹터별 거래량 집계
     11개 섹터의 평균 거래량 스파이크 반환
     """
     try:
-        # 섹터 ETF 데이터 수집
-        from config.etf_universe import SECTOR_ETFS
-        tickers = list(SECTOR_ETFS.keys())
-        
-        # 데이터 수집 및 분석
-        df = analyzer.collector.fetch_multiple(tickers, period=period)
-        df = analyzer.detector.calculate_volume_features(df)
-        
-        # 섹터 집계
-        result = sector_aggregator.get_sector_summary(df)
+        snapshot = scheduler.get('sectors') if period == DEFAULT_SECTOR_PERIOD else None
+        if snapshot is not None:
+            key = ('sectors', 'snapshot', scheduler.version('sectors'))
+            return await _cached_json(request, key, lambda: snapshot)
         
-        return JSONResponse(result)
+        key = _version_key('sectors', list(SECTOR_ETFS.keys()), period)
+        return await _cached_json(request, key, _sector_summary, period)
+    except PoolSaturated:
+        return _busy_response()
     except Exception as e:
         return JSONResponse(
             content={
@@ -105,17 +243,67 @@ async def api_sectors(period: str = "5d"):
             status_code=500
         )
 
+@app.get("/api/sectors/history")
+async def api_sectors_history(period: str = "2y", days: int = Query(60, ge=1)):
+    """
+    섹터별 Z-Score / 시그널 시계열 (히트맵 재생용)
+    ?period=2y 데이터 수집 기간 (장기 Z-Score 252일 윈도우 확보)
+    ?days=60 반환할 최근 거래일 수 (1 이상)
+    """
+    try:
+        result = await worker_pool.run(_sector_history, period, days)
+        return JSONBytesResponse(result)
+    except PoolSaturated:
+        return _busy_response()
+    except Exception as e:
+        return JSONResponse(
+            content={
+                "error": True,
+                "message": f"섹터 히스토리 조회 중 오류 발생: {str(e)}",
+                "timestamp": __import__('datetime').datetime.now().isoformat()
+            },
+            status_code=500
+        )
+
+@app.get("/api/stream")
+async def api_stream(request: Request):
+    """
+    빠른 스캔/섹터 변경분 스트림 (Server-Sent Events)
+    - 연결 직후 event: snapshot (전체 상태)
+    - 이후 event: quick (새 봉 등으로 바뀐 필드), event: sectors (시그널/상태 변화)
+      data: {"seq": n, "channel": ..., "upsert": {티커: {필드: 값}}, "remove": [티커]}
+    - 변경이 없으면 주기적으로 keep-alive 주석만 전송
+    """
+    return StreamingResponse(
+        live_feed.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/ticker/{ticker}")
-async def api_ticker_detail(ticker: str, period: str = "1y"):
+async def api_ticker_detail(
+    request: Request,
+    ticker: str,
+    period: str = "1y",
+    layout: str = "rows",
+    max_points: Optional[int] = Query(None, ge=3)
+):
     """
     특정 티커의 상세 데이터 반환
     - 가격/거래량 히스토리
     - 거래량 스파이크 이벤트 목록
+    ?layout=columns 컬럼 지향 형태 ({"date": [...], "close": [...], ...}) - 차트 직접 사용, 페이로드 축소
+    ?max_points=500 히스토리 다운샘플링 (가격 LTTB, 거래량 구간 최대값, 3 이상)
     """
     try:
-        # 데이터 수집
-        df = analyzer.collector.fetch_multiple([ticker], period=period)
-        if df.empty:
+        # 데이터 수집 + 거래량 분석 (티커별 특성 캐시 공유)
+        key = _version_key('ticker', [ticker], period, layout, max_points)
+        response = await _cached_json(
+            request, key,
+            analyzer.ticker_detail,
+            ticker, period=period, layout=layout, max_points=max_points
+        )
+        if response is None:
             return JSONResponse(
                 content={
                     "error": True,
@@ -124,58 +312,9 @@ async def api_ticker_detail(ticker: str, period: str = "1y"):
                 status_code=404
             )
         
-        # 거래량 분석
-        df = analyzer.detector.calculate_volume_features(df)
-        
-        # 히스토리 데이터 포맷팅
-        history = []
-        for _, row in df.iterrows():
-            history.append({
-                "date": row['Date'].strftime('%Y-%m-%d'),
-                "open": float(row['Open']),
-                "high": float(row['High']),
-                "low": float(row['Low']),
-                "close": float(row['Close']),
-                "volume": int(row['Volume']),
-                "volume_ma": float(row['Volume_MA']) if 'Volume_MA' in row and not pd.isna(row['Volume_MA']) else None,
-                "volume_spike_ratio": float(row['Volume_Spike_Ratio']) if 'Volume_Spike_Ratio' in row and not pd.isna(row['Volume_Spike_Ratio']) else None,
-            })
-        
-        # 스파이크 이벤트 탐지
-        events = []
-        for _, row in df.iterrows():
-            if 'Volume_Spike_Ratio' in row and not pd.isna(row['Volume_Spike_Ratio']):
-                ratio = row['Volume_Spike_Ratio']
-                if ratio >= 1.5:  # MEDIUM 이상만
-                    level = 'extreme' if ratio >= 2.5 else 'high' if ratio >= 2.0 else 'medium' if ratio >= 1.5 else 'alert'
-                    events.append({
-                        "date": row['Date'].strftime('%Y-%m-%d'),
-                        "level": level,
-                        "ratio": float(ratio),
-                        "volume": int(row['Volume']),
-                        "price": float(row['Close']),
-                        "price_change": float(row['Close'] - row['Open'])
-                    })
-        
-        # 최신 데이터
-        latest = df.iloc[-1]
-        
-        result = {
-            "ticker": ticker,
-            "name": ticker,  # TODO: 실제 이름 매핑
-            "latest": {
-                "date": latest['Date'].strftime('%Y-%m-%d'),
-                "price": float(latest['Close']),
-                "volume": int(latest['Volume']),
-                "volume_spike_ratio": float(latest['Volume_Spike_Ratio']) if not pd.isna(latest['Volume_Spike_Ratio']) else None,
-                "price_change": float(latest['Close'] - latest['Open']),
-                "price_change_pct": float((latest['Close'] - latest['Open']) / latest['Open'] * 100)
-            },
-            "history": history,
-            "events": sorted(events, key=lambda x: x['date'], reverse=True)[:20]  # 최근 20개
-        }
-        
-        return JSONResponse(result)
+        return response
+    except PoolSaturated:
+        return _busy_response()
     except Exception as e:
         import traceback
         return JSONResponse(
@@ -188,11 +327,87 @@ async def api_ticker_detail(ticker: str, period: str = "1y"):
             status_code=500
         )
 
+@app.get("/api/tickers")
+async def api_ticker_details(
+    request: Request,
+    symbols: str,
+    period: str = "1y",
+    layout: str = "rows",
+    max_points: Optional[int] = Query(None, ge=3)
+):
+    """
+    여러 티커 상세 데이터를 한 번에 반환 (비교 화면용)
+    ?symbols=XLK,XLF,XLE 티커 목록 (최대 MAX_BATCH_TICKERS개)
+    ?period, ?layout, ?max_points는 /api/ticker/{ticker}와 동일
+    수집은 병렬, 거래량 특성 계산은 전체 티커에 대해 한 번
+    """
+    ticker_list = list(dict.fromkeys(symbol.strip() for symbol in symbols.split(',') if symbol.strip()))
+    if not ticker_list or len(ticker_list) > MAX_BATCH_TICKERS:
+        return JSONResponse(
+            content={
+                "error": True,
+                "message": f"symbols에 1~{MAX_BATCH_TICKERS}개 티커를 지정하세요.",
+            },
+            status_code=400
+        )
+    
+    try:
+        key = _version_key('tickers', ticker_list, period, layout, max_points)
+        response = await _cached_json(
+            request, key,
+            analyzer.ticker_details,
+            ticker_list, period=period, layout=layout, max_points=max_points
+        )
+        if response is None:
+            return JSONResponse(
+                content={
+                    "error": True,
+                    "message": f"티커 {','.join(ticker_list)} 데이터를 찾을 수 없습니다.",
+                },
+                status_code=404
+            )
+        
+        return response
+    except PoolSaturated:
+        return _busy_response()
+    except Exception as e:
+        return JSONResponse(
+            content={
+                "error": True,
+                "message": f"티커 상세 데이터 조회 중 오류 발생: {str(e)}",
+                "timestamp": __import__('datetime').datetime.now().isoformat()
+            },
+            status_code=500
+        )
+
+@app.get("/metrics")
+def api_metrics():
+    """Prometheus 형식 성능 지표 (단계별 소요 시간, 업스트림 지연, 캐시 적중률)"""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+def _runtime_metrics() -> list:
+    """조회 시점의 캐시 통계 / 작업 풀 상태"""
+    pool = worker_pool.stats()
+    return metrics.cache_families({
+        'ohlcv': analyzer.collector.cache_stats(),
+        'features': analyzer.feature_cache.stats(),
+        'results': analyzer.result_cache.stats(),
+        'responses': http_cache.stats(),
+    }) + [
+        ('etf_worker_pool_pending', 'gauge', '작업 풀 실행 + 대기 작업 수', [({}, pool['pending'])]),
+        ('etf_stream_subscribers', 'gauge', '/api/stream 구독자 수', [({}, live_feed.stats()['subscribers'])]),
+    ]
+
+metrics.REGISTRY.add_collector(_runtime_metrics)
+
 @app.get("/api/blob")
 def api_blob():
     """레거시 엔드포인트 - 빠른 스캔으로 리다이렉트"""
     result = analyzer.quick_scan()
-    return JSONResponse(result)
+    return JSONBytesResponse(result)
 
 @app.post("/api/explain")
 async def api_explain(payload: dict = Body(...)):
@@ -0,0 +1,151 @@
+"""
+메모리 캐시 모듈
+TTL 만료 + LRU 축출 (항목 수 / 바이트 상한)
+"""
+from collections import OrderedDict
+import sys
+import threading
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, Hashable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """캐시 항목의 대략적인 메모리 크기 (bytes)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    return sys.getsizeof(value)
+
+
+class DataFrameCache:
+    """
+    TTL + LRU 캐시
+
+    - 만료 판정은 time.monotonic() 기준 (시스템 시각 변경에 영향 없음)
+    - max_entries 또는 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 축출
+    - 스레드 안전 (fetch_multiple의 병렬 수집에서 동시 접근)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 256,
+        max_bytes: int = 256 * 1024 * 1024,
+        sizeof: Callable[[Any], int] = estimate_size
+    ):
+        """
+        Args:
+            ttl: 항목 유효 시간 (초)
+            max_entries: 최대 항목 수
+            max_bytes: 최대 메모리 사용량 (bytes)
+            sizeof: 항목 크기 계산 함수
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, 저장 시각, 크기)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """캐시 조회 (없거나 만료되었으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, stored_at, _ = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """통계/LRU 순서를 바꾸지 않는 조회 (만료 항목은 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                return None
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """캐시 저장 (상한 초과 시 LRU 축출)"""
+        size = self.sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self.max_bytes:
+                logger.warning(f"캐시 항목이 상한보다 큼, 저장 안 함: {key} ({size} bytes)")
+                return
+
+            self._entries[key] = (value, time.monotonic(), size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        캐시 무효화
+
+        Args:
+            predicate: key를 받아 True면 삭제 (None이면 전체 삭제)
+
+        Returns:
+            삭제된 항목 수
+        """
+        with self._lock:
+            keys = [k for k in self._entries if predicate is None or predicate(k)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """전체 삭제"""
+        self.invalidate()
+
+    def stats(self) -> Dict:
+        """캐시 통계"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,327 @@
+"""
+OHLCV 데이터 소스
+- YFinanceSource: yfinance 실시간 조회 (기본)
+- ReplaySource: 기록된 파일을 결정적으로 재생 (오프라인 벤치마크/테스트용)
+- SyntheticSource: 티커별 고정 시드로 합성 OHLCV 생성
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = "America/New_York"
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def period_window(
+    period: str,
+    now: Optional[datetime] = None
+) -> Tuple[Optional[pd.Timestamp], Optional[int]]:
+    """
+    yfinance period 문자열을 조회 구간으로 변환
+
+    Returns:
+        (시작일, 봉 개수)
+        - '5d' 같은 일 단위는 최근 N개 거래일 → (None, N)
+        - 'mo'/'y'/'ytd'는 달력 기준 → (시작일, None)
+        - 'max' 또는 해석 불가 → (None, None)
+    """
+    today = pd.Timestamp(now or datetime.now()).normalize()
+    if today.tzinfo is not None:
+        today = today.tz_localize(None)
+
+    if period == 'ytd':
+        return pd.Timestamp(year=today.year, month=1, day=1), None
+    if period.endswith('mo') and period[:-2].isdigit():
+        return today - pd.DateOffset(months=int(period[:-2])), None
+    if period.endswith('y') and period[:-1].isdigit():
+        return today - pd.DateOffset(years=int(period[:-1])), None
+    if period.endswith('d') and period[:-1].isdigit():
+        return None, int(period[:-1])
+
+    return None, None
+
+
+class DataSource(ABC):
+    """
+    OHLCV 데이터 소스 인터페이스
+
+    history()는 yfinance Ticker.history()와 같은 형태를 반환한다:
+    'Date' DatetimeIndex + Open/High/Low/Close/Volume 컬럼, 데이터 없으면 빈 DataFrame.
+    """
+
+    name = "base"
+    is_remote = True  # False면 로컬 저장소(OHLCVStore) 사용 안 함
+
+    @abstractmethod
+    def history(
+        self,
+        ticker: str,
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        일봉 히스토리 조회
+
+        Args:
+            ticker: 티커
+            period: 기간 (start가 없을 때 사용)
+            start: 시작일 (포함, YYYY-MM-DD)
+            end: 종료일 (미포함, YYYY-MM-DD)
+        """
+
+    def now(self) -> datetime:
+        """period 구간 계산 기준 시각"""
+        return datetime.now()
+
+
+class YFinanceSource(DataSource):
+    """yfinance 실시간 데이터"""
+
+    name = "yfinance"
+
+    def history(self, ticker, period=None, start=None, end=None):
+        import yfinance as yf
+
+        if start:
+            return yf.Ticker(ticker).history(start=start, end=end)
+        return yf.Ticker(ticker).history(period=period or "1y")
+
+
+class _FrameSource(DataSource):
+    """메모리에 올린 티커별 DataFrame을 yfinance와 같은 규칙으로 잘라서 반환"""
+
+    is_remote = False
+
+    def __init__(self, as_of: Optional[str] = None):
+        """
+        Args:
+            as_of: period 계산 기준일 (None이면 데이터의 마지막 날짜)
+        """
+        self.as_of = pd.Timestamp(as_of) if as_of else None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    @abstractmethod
+    def _load(self, ticker: str) -> Optional[pd.DataFrame]:
+        """티커 전체 히스토리 (Date 인덱스, 오름차순)"""
+
+    def _frame(self, ticker: str) -> Optional[pd.DataFrame]:
+        if ticker not in self._frames:
+            self._frames[ticker] = self._load(ticker)
+        return self._frames[ticker]
+
+    def now(self) -> datetime:
+        if self.as_of is not None:
+            return self.as_of.to_pydatetime()
+
+        last_dates = [df.index[-1] for df in self._frames.values() if df is not None]
+        if not last_dates:
+            return datetime.now()
+        return max(last_dates).tz_localize(None).to_pydatetime()
+
+    def history(self, ticker, period=None, start=None, end=None):
+        df = self._frame(ticker)
+        if df is None:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        if self.as_of is not None:
+            df = df[df.index.tz_localize(None) < self.as_of + pd.Timedelta(days=1)]
+
+        if start:
+            df = df[df.index >= pd.Timestamp(start, tz=df.index.tz)]
+            if end:
+                df = df[df.index < pd.Timestamp(end, tz=df.index.tz)]
+            return df
+
+        window_start, bars = period_window(period or "1y", self.now())
+        if bars is not None:
+            return df.tail(bars)
+        if window_start is not None:
+            return df[df.index >= window_start.tz_localize(df.index.tz)]
+        return df
+
+
+class ReplaySource(_FrameSource):
+    """
+    기록 파일 재생
+
+    data_dir/{TICKER}.csv (또는 .parquet/.pkl) 파일을 읽는다. 파일 이름의 대소문자는
+    구분하지 않는다 (spy.csv == SPY.csv).
+    파일 형식: Date, Open, High, Low, Close, Volume 컬럼 (record_history 출력과 동일)
+    """
+
+    name = "replay"
+    suffixes = (".parquet", ".pkl", ".csv")  # 같은 티커 파일이 여럿이면 앞쪽 우선
+
+    def __init__(self, data_dir: str, as_of: Optional[str] = None):
+        super().__init__(as_of=as_of)
+        self.data_dir = Path(data_dir)
+        self._paths = self._index()
+        # period 기준일을 전체 데이터의 마지막 날짜로 고정하기 위해 미리 로드
+        for ticker in sorted(self._paths):
+            self._frame(ticker)
+
+    def __reduce__(self):
+        # 다른 프로세스(샤드 워커)로 보낼 때 로드한 데이터 대신 생성 인자만 전달
+        return (ReplaySource, (str(self.data_dir), self.as_of))
+
+    def _index(self) -> Dict[str, Path]:
+        """대문자 티커 → 파일 경로"""
+        files = sorted(self.data_dir.glob("*.*"))
+        paths = {}
+        for suffix in self.suffixes:
+            for path in files:
+                if path.suffix.lower() == suffix:
+                    paths.setdefault(path.stem.upper(), path)
+        return paths
+
+    def _load(self, ticker):
+        path = self._paths.get(ticker.upper())
+        if path is None:
+            self._paths = self._index()  # 시작 후 추가된 파일
+            path = self._paths.get(ticker.upper())
+        if path is None:
+            logger.warning(f"{ticker} 재생 데이터 없음: {self.data_dir}")
+            return None
+        suffix = path.suffix.lower()
+
+        if suffix == ".parquet":
+            df = pd.read_parquet(path)
+        elif suffix == ".pkl":
+            df = pd.read_pickle(path)
+        else:
+            df = pd.read_csv(path)
+
+        if 'Date' in df.columns:
+            dates = pd.to_datetime(df['Date'], utc=True).dt.tz_convert(MARKET_TZ)
+            df = df.drop(columns='Date').set_index(pd.DatetimeIndex(dates, name='Date'))
+        elif df.index.tz is None:
+            df.index = df.index.tz_localize(MARKET_TZ)
+
+        return df.sort_index()
+
+
+class SyntheticSource(_FrameSource):
+    """
+    합성 OHLCV 생성
+
+    티커 이름으로 시드를 고정하므로 같은 (ticker, days, end)는 항상 같은 데이터.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, days: int = 2520, end: str = "2024-12-31", seed: int = 0):
+        super().__init__(as_of=end)
+        self.days = days
+        self.end = end
+        self.seed = seed
+
+    def __reduce__(self):
+        return (SyntheticSource, (self.days, self.end, self.seed))
+
+    def _load(self, ticker):
+        return generate_synthetic_ohlcv(ticker, days=self.days, end=self.end, seed=self.seed)
+
+
+def generate_synthetic_ohlcv(
+    ticker: str,
+    days: int = 252,
+    end: str = "2024-12-31",
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    합성 일봉 OHLCV 생성 (yfinance history() 형태)
+
+    - 종가: 기하 브라운 운동 (일 변동성 1~2%)
+    - 거래량: 로그정규 + AR(1) 지속성, 약 2% 확률로 2~4배 스파이크
+      (스파이크 당일은 가격 변동도 커짐)
+
+    Args:
+        ticker: 티커 (시드 결정)
+        days: 거래일 수
+        end: 마지막 거래일
+        seed: 추가 시드
+    """
+    rng = np.random.default_rng([zlib.crc32(ticker.encode()), seed])
+    dates = pd.bdate_range(end=end, periods=days, tz=MARKET_TZ, name='Date')
+
+    base_volume = rng.uniform(1e6, 5e7)
+    noise = rng.normal(0, 0.25, days)
+    log_volume = np.empty(days)
+    log_volume[0] = noise[0]
+    for i in range(1, days):
+        log_volume[i] = 0.6 * log_volume[i - 1] + noise[i]
+
+    spikes = rng.random(days) < 0.02
+    spike_mult = np.where(spikes, rng.uniform(2.0, 4.0, days), 1.0)
+    volume = (base_volume * np.exp(log_volume) * spike_mult).astype(np.int64)
+
+    sigma = rng.uniform(0.01, 0.02)
+    returns = rng.normal(0.0003, sigma, days) * np.where(spikes, 2.5, 1.0)
+    close = rng.uniform(20, 500) * np.exp(np.cumsum(returns))
+    open_ = close * np.exp(-returns * rng.uniform(0.2, 0.8, days))
+    wick = np.abs(rng.normal(0, sigma / 2, days))
+    high = np.maximum(open_, close) * (1 + wick)
+    low = np.minimum(open_, close) * (1 - wick)
+
+    return pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+        index=dates
+    )
+
+
+def record_history(
+    tickers: List[str],
+    out_dir: str,
+    period: str = "1y",
+    source: Optional[DataSource] = None
+) -> List[str]:
+    """
+    소스 데이터를 ReplaySource용 CSV로 기록
+
+    Returns:
+        기록된 티커 리스트
+    """
+    source = source or YFinanceSource()
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    recorded = []
+    for ticker in tickers:
+        df = source.history(ticker, period=period)
+        if df.empty:
+            logger.warning(f"{ticker} 기록할 데이터 없음")
+            continue
+        df[OHLCV_COLUMNS].to_csv(out / f"{ticker}.csv", index_label='Date')
+        recorded.append(ticker)
+
+    return recorded
+
+
+def create_source(name: str = "yfinance", replay_dir: Optional[str] = None) -> DataSource:
+    """
+    설정 이름으로 데이터 소스 생성
+
+    Args:
+        name: yfinance | replay | synthetic
+        replay_dir: replay 소스 데이터 디렉토리
+    """
+    name = (name or "yfinance").lower()
+
+    if name == "yfinance":
+        return YFinanceSource()
+    if name == "replay":
+        if not replay_dir:
+            raise ValueError("replay 소스는 REPLAY_DATA_DIR 설정 필요")
+        return ReplaySource(replay_dir)
+    if name == "synthetic":
+        return SyntheticSource()
+
+    raise ValueError(f"알 수 없는 데이터 소스: {name}")
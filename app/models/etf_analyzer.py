@@ -2,7 +2,14 @@
 ETF 통합 분석 파이프라인
 데이터 수집 → 특성 계산 → 이벤트 탐지 → 결과 생성
 """
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import heapq
+from itertools import islice, repeat
+import multiprocessing
+import pickle
+import threading
+import time
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Any
@@ -14,56 +21,335 @@ import json
 # 상위 디렉토리를 path에 추가
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config.pandas_options import configure_pandas
+from models.data_cache import DataFrameCache
+from models.data_sources import DataSource, create_source
 from models.etf_data_collector import ETFDataCollector
-from models.volume_event_detector import VolumeEventDetector
+from models.ohlcv_schema import concat_tickers, display_prices
+from models.volume_event_detector import TOP_SPIKE_COLUMNS, VolumeEventDetector, VolumeState
+from services.downsampling import bucket_max, bucket_min, lttb_indices, segment_starts
+from services.metrics import STAGE_SECONDS
+from services.serialization import frame_to_columns, frame_to_records, to_float
 from config.etf_universe import (
     ALL_ETFS, 
     VOLUME_SPIKE_THRESHOLDS,
     MA_PERIOD,
     EVENT_HISTORY_DAYS,
-    LOOKBACK_DAYS
+    LOOKBACK_DAYS,
+    FEATURE_ENGINE,
+    LIVE_STATE_PERIOD,
+    FETCH_MAX_WORKERS,
+    OHLCV_STORE_DIR,
+    CACHE_TTL_SECONDS,
+    CACHE_MAX_ENTRIES,
+    CACHE_MAX_BYTES,
+    DATA_SOURCE,
+    REPLAY_DATA_DIR,
+    RESULT_CACHE_MAX_ENTRIES,
+    SHARD_WORKERS,
+    SHARD_MIN_TICKERS
 )
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class AnalysisSession:
+    """
+    지연 평가 분석 파이프라인
+    
+    각 단계는 처음 요청될 때 한 번만 계산되고 같은 세션 안에서 재사용된다.
+    엔드포인트는 필요한 단계만 get()으로 꺼내므로 쓰지 않는 단계는 계산하지 않는다.
+    
+    단계 (의존 관계):
+        features → classified → events → summary
+                              ↘ top_spikes
+                     events → ticker_analysis
+    """
+    
+    def __init__(self, analyzer: 'ETFAnalyzer', tickers: List[str], period: str):
+        self.analyzer = analyzer
+        self.detector = analyzer.detector
+        self.tickers = list(tickers)
+        self.period = period
+        self._results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}  # 단계 → 자체 소요 시간 (초, 선행 단계 제외)
+        self.versions: Dict[str, int] = {}  # 티커 → features 계산에 쓴 데이터 버전
+        self._child_seconds: List[float] = []  # 계산 중인 단계별 선행 단계 소요 시간 합
+    
+    def get(self, stage: str) -> Any:
+        """단계 결과 (없으면 계산)"""
+        if stage not in self._results:
+            builder = getattr(self, f'_build_{stage}', None)
+            if builder is None:
+                raise KeyError(f"알 수 없는 분석 단계: {stage}")
+            
+            self._child_seconds.append(0.0)
+            started = time.perf_counter()
+            try:
+                self._results[stage] = builder()
+            finally:
+                elapsed = time.perf_counter() - started
+                own = elapsed - self._child_seconds.pop()
+                if self._child_seconds:
+                    self._child_seconds[-1] += elapsed
+                self.timings[stage] = own
+                STAGE_SECONDS.observe(own, stage=stage)
+        return self._results[stage]
+    
+    def _build_features(self) -> pd.DataFrame:
+        """
+        거래량 특성 (티커별 특성 캐시 공유)
+        
+        내부의 fetch / volume_features 시간은 별도 항목으로 기록하고
+        features에는 나머지(캐시 조회, 병합)만 남겨서 단계 합이 전체 시간과 맞게 한다.
+        """
+        nested: Dict[str, float] = {}
+        df = self.analyzer.features(self.tickers, self.period, timings=nested, versions=self.versions)
+        self.timings.update(nested)
+        self._child_seconds[-1] += sum(nested.values())
+        return df
+    
+    def _build_classified(self) -> pd.DataFrame:
+        """특성 + 전체 기간 Event_Level"""
+        df = self.get('features')
+        return df.assign(Event_Level=self.detector.classify_events(df['Volume_Spike_Ratio']))
+    
+    def _build_events(self) -> pd.DataFrame:
+        return self.detector.detect_events(self.get('classified'), recent_days=EVENT_HISTORY_DAYS)
+    
+    def _build_summary(self) -> Dict:
+        return self.detector.get_event_summary(self.get('events'))
+    
+    def _build_top_spikes(self) -> List[Dict]:
+        df = self.get('classified')
+        cutoff_date = df['Date'].max() - pd.Timedelta(days=EVENT_HISTORY_DAYS)
+        return self.detector.find_top_spikes(df, top_n=10, min_date=cutoff_date)
+    
+    def _build_ticker_analysis(self) -> Dict:
+        """이벤트 발생 티커 상위 5개 상세 분석"""
+        events = self.get('events')
+        df = self.get('classified')
+        event_tickers = events['Ticker'].unique() if not events.empty else []
+        ticker_analysis = {}
+        
+        for ticker in event_tickers[:5]:
+            analysis = self.detector.analyze_ticker(df, ticker)
+            if analysis:
+                ticker_analysis[ticker] = analysis
+        
+        return ticker_analysis
+
+# 샤드 워커 프로세스별 분석기 (수집기/특성 캐시 재사용) + 생성에 쓴 설정 (pickle)
+_shard_analyzer: Optional['ETFAnalyzer'] = None
+_shard_settings: Optional[bytes] = None
+
+
+def _analyze_shard(
+    tickers: List[str],
+    period: str,
+    settings: bytes,
+    force_refresh: bool = False
+) -> Optional[Dict]:
+    """
+    샤드 분석 (프로세스 풀 워커에서 실행)
+    
+    수집 → 거래량 특성 → 이벤트 분류까지 샤드 안에서 끝내고, 부모 프로세스가
+    병합하는 데 필요한 작은 결과만 돌려준다. 최근 구간 기준일은 샤드의 최종일이라
+    전체 최종일보다 이를 수 있으므로 이벤트/스파이크 후보는 넉넉하게 반환하고
+    부모가 전체 기준일로 다시 거른다.
+    
+    Args:
+        settings: 부모 분석기의 데이터 소스/탐지기 설정 (ETFAnalyzer.shard_settings)
+        force_refresh: 워커의 수집기/특성/결과 캐시를 비우고 재수집
+    
+    Returns:
+        {'rows', 'start', 'end', 'events', 'spikes', 'ticker_analysis'}
+        (spikes는 Volume_Spike_Ratio 내림차순), 샤드 전체 수집 실패 시 None
+    """
+    global _shard_analyzer, _shard_settings
+    if _shard_analyzer is None or settings != _shard_settings:
+        options = pickle.loads(settings)
+        _shard_analyzer = ETFAnalyzer(
+            source=options['source'],
+            detector=VolumeEventDetector(**options['detector']),
+            fetch_workers=options['fetch_workers']
+        )
+        _shard_settings = settings
+    if force_refresh:
+        for ticker in tickers:
+            _shard_analyzer.collector.invalidate(ticker)
+            _shard_analyzer._on_data_update(ticker)
+    session = _shard_analyzer.session(tickers, period)
+    
+    try:
+        df = session.get('classified')
+    except ValueError as e:
+        logger.warning(f"샤드 {tickers[0]}~{tickers[-1]} 수집 실패: {e}")
+        return None
+    
+    cutoff_date = df['Date'].max() - pd.Timedelta(days=EVENT_HISTORY_DAYS)
+    spikes = df.loc[df['Date'] >= cutoff_date, TOP_SPIKE_COLUMNS].dropna(subset=['Volume_Spike_Ratio'])
+    
+    return {
+        'rows': len(df),
+        'start': df['Date'].min(),
+        'end': df['Date'].max(),
+        'events': session.get('events'),
+        'spikes': spikes.sort_values('Volume_Spike_Ratio', ascending=False, kind='stable'),
+        'ticker_analysis': session.get('ticker_analysis')
+    }
+
+
+def _descending(shard: int, values: np.ndarray):
+    """k-way merge 입력: (-값, 샤드 번호, 행 위치) (동점은 앞 샤드/앞 행 우선)"""
+    return ((-value, shard, position) for position, value in enumerate(values))
+
+
+def _merge_top(frames: List[pd.DataFrame], column: str, n: int) -> pd.DataFrame:
+    """
+    column 내림차순으로 정렬된 샤드별 DataFrame → 전체 상위 n행 (heapq k-way merge)
+    
+    샤드가 정렬된 티커 구간 순서이므로 동점 순서는 전체 DataFrame의 nlargest와 같다.
+    """
+    streams = [_descending(shard, frame[column].to_numpy(dtype=float)) for shard, frame in enumerate(frames)]
+    picked = list(islice(heapq.merge(*streams), n))
+    if not picked:
+        return frames[0].iloc[:0]
+    return pd.concat([frames[shard].iloc[[position]] for _, shard, position in picked])
+
+
 class ETFAnalyzer:
     """ETF 거래량 분석 통합 시스템"""
     
-    def __init__(self):
-        self.collector = ETFDataCollector()
-        self.detector = VolumeEventDetector(
+    def __init__(
+        self,
+        source: Optional[DataSource] = None,
+        detector: Optional[VolumeEventDetector] = None,
+        fetch_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            source: OHLCV 데이터 소스 (None이면 DATA_SOURCE 설정)
+            detector: 이벤트 탐지기 (None이면 MA_PERIOD / 임계값 / FEATURE_ENGINE 설정)
+            fetch_workers: 동시 다운로드 수 (None이면 FETCH_MAX_WORKERS)
+        """
+        self.collector = ETFDataCollector(
+            max_workers=fetch_workers or FETCH_MAX_WORKERS,
+            store_dir=OHLCV_STORE_DIR or None,
+            cache_ttl=CACHE_TTL_SECONDS,
+            cache_max_entries=CACHE_MAX_ENTRIES,
+            cache_max_bytes=CACHE_MAX_BYTES,
+            source=source or create_source(DATA_SOURCE, REPLAY_DATA_DIR)
+        )
+        self.detector = detector or VolumeEventDetector(
             ma_period=MA_PERIOD,
-            thresholds=VOLUME_SPIKE_THRESHOLDS
+            thresholds=VOLUME_SPIKE_THRESHOLDS,
+            engine=FEATURE_ENGINE
         )
-        self.data_cache = None
         self.last_update = None
+        # 파이프라인 결과 캐시: (티커, 기간, 임계값, MA 기간, 데이터 버전) → 결과
+        self.result_cache = DataFrameCache(
+            ttl=CACHE_TTL_SECONDS,
+            max_entries=RESULT_CACHE_MAX_ENTRIES
+        )
+        # 티커별 거래량 특성 캐시: (티커, 기간, MA 기간, 엔진, 데이터 버전) → DataFrame
+        self.feature_cache = DataFrameCache(
+            ttl=CACHE_TTL_SECONDS,
+            max_entries=CACHE_MAX_ENTRIES,
+            max_bytes=CACHE_MAX_BYTES
+        )
+        self.collector.add_listener(self._on_data_update)
+        self.shard_workers = SHARD_WORKERS
+        # 빠른 스캔용 티커별 증분 거래량 상태 (새 봉만 반영, 히스토리 재계산 없음)
+        self._live_states: Dict[str, VolumeState] = {}
+        self._live_lock = threading.Lock()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
     
-    def _json_safe(self, obj: Any) -> Any:
-        """
-        JSON 직렬화 가능하도록 객체 변환
-        Timestamp, NaN, NaT 등을 안전한 타입으로 변환
-        """
-        if isinstance(obj, dict):
-            return {key: self._json_safe(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._json_safe(item) for item in obj]
-        elif isinstance(obj, (pd.Timestamp, datetime)):
-            return obj.isoformat() if pd.notna(obj) else None
-        elif isinstance(obj, (np.integer, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64)):
-            return None if np.isnan(obj) else float(obj)
-        elif pd.isna(obj):
-            return None
-        else:
-            return obj
+    def _on_data_update(self, ticker: str) -> None:
+        """새 데이터가 들어온 티커의 특성/결과 캐시 무효화"""
+        self.feature_cache.invalidate(lambda key: key[0] == ticker)
+        self.result_cache.invalidate(lambda key: ticker in key[0])
+    
+    def session(self, tickers: List[str], period: str = "1y") -> AnalysisSession:
+        """지연 평가 분석 세션 생성"""
+        return AnalysisSession(self, tickers, period)
+    
+    def features(
+        self,
+        tickers: List[str],
+        period: str = "1y",
+        timings: Optional[Dict[str, float]] = None,
+        versions: Optional[Dict[str, int]] = None
+    ) -> pd.DataFrame:
+        """
+        티커들의 거래량 특성 DataFrame
+        
+        같은 데이터 버전의 특성이 캐시에 있는 티커는 재사용하고, 나머지만
+        수집해서 한 번에 계산한다. 엔드포인트 간 특성 계산 중복 제거용.
+        
+        Args:
+            timings: 주어지면 fetch / volume_features 소요 시간(초) 기록
+            versions: 주어지면 티커별로 계산에 쓴 데이터 버전 기록
+        
+        Returns:
+            calculate_volume_features와 같은 형태 (Ticker, Date 정렬)
+        """
+        frames = {}
+        missing = []
+        
+        for ticker in tickers:
+            version = self.collector.fresh_version([ticker], period)
+            cached = (
+                self.feature_cache.get(self._feature_key(ticker, period, version))
+                if version is not None else None
+            )
+            if cached is not None:
+                frames[ticker] = cached
+                if versions is not None:
+                    versions[ticker] = version[0]
+            else:
+                missing.append(ticker)
+        
+        if missing:
+            started = time.perf_counter()
+            fetched_versions = {}  # 수집 시점 버전 (계산 중 새 데이터가 들어와도 이 버전으로 캐시)
+            raw = self.collector.fetch_multiple(missing, period=period, versions=fetched_versions)
+            fetched = time.perf_counter()
+            computed = self.detector.calculate_volume_features(raw)
+            split = {'fetch': fetched - started, 'volume_features': time.perf_counter() - fetched}
+            for stage, seconds in split.items():
+                STAGE_SECONDS.observe(seconds, stage=stage)
+            if timings is not None:
+                timings.update(split)
+            for ticker, ticker_df in computed.groupby('Ticker', sort=False, observed=True):
+                version = (fetched_versions[ticker],)
+                self.feature_cache.set(self._feature_key(ticker, period, version), ticker_df)
+                if versions is not None:
+                    versions[ticker] = version[0]
+                frames[ticker] = ticker_df
+        
+        return concat_tickers({ticker: frames[ticker] for ticker in sorted(frames)})
+    
+    def _feature_key(self, ticker: str, period: str, version: tuple) -> tuple:
+        return (ticker, period, self.detector.ma_period, self.detector.engine, version)
+    
+    def _result_key(self, tickers: List[str], period: str, version: tuple) -> tuple:
+        return (
+            tuple(tickers),
+            period,
+            tuple(sorted(self.detector.thresholds.items())),
+            self.detector.ma_period,
+            version
+        )
     
     def run_full_pipeline(
         self, 
         tickers: Optional[List[str]] = None,
         period: str = "1y",
-        force_refresh: bool = False
+        force_refresh: bool = False,
+        include_timings: bool = False,
+        sharded: Optional[bool] = None
     ) -> Dict:
         """
         전체 분석 파이프라인 실행
@@ -72,6 +358,9 @@ class ETFAnalyzer:
             tickers: 분석할 티커 리스트 (None이면 전체 유니버스)
             period: 데이터 수집 기간
             force_refresh: 캐시 무시하고 재수집
+            include_timings: metadata.timings에 단계별 소요 시간(ms) 포함 (결과 캐시 미사용, 특성 캐시는 사용)
+            sharded: 티커를 나눠 여러 프로세스에서 분석 (None이면 티커 수가
+                SHARD_MIN_TICKERS 이상이고 SHARD_WORKERS가 2 이상일 때 자동)
         
         Returns:
             {
@@ -83,6 +372,7 @@ class ETFAnalyzer:
             }
         """
         logger.info("=== ETF 분석 파이프라인 시작 ===")
+        started = time.perf_counter()
         
         # 1단계: 데이터 수집
         if tickers is None:
@@ -90,57 +380,43 @@ class ETFAnalyzer:
         
         logger.info(f"분석 대상: {len(tickers)}개 ETF")
         
+        if sharded is None:
+            sharded = 0 < SHARD_MIN_TICKERS <= len(tickers) and self.shard_workers > 1
+        if sharded:
+            return self._run_sharded(tickers, period, started, include_timings, force_refresh)
+        
+        if force_refresh:
+            for ticker in tickers:
+                self.collector.invalidate(ticker)
+        elif not include_timings:  # 소요 시간 요청은 단계별 측정을 위해 결과 캐시 미사용
+            version = self.collector.fresh_version(tickers, period)
+            if version is not None:
+                cached = self.result_cache.get(self._result_key(tickers, period, version))
+                if cached is not None:
+                    logger.info("=== 캐시된 분석 결과 반환 ===")
+                    return cached
+        
+        session = self.session(tickers, period)
+        
+        # 1~2단계: 데이터 수집 + 거래량 특성 계산
         try:
-            df = self.collector.fetch_multiple(tickers, period=period)
-            logger.info(f"데이터 수집 완료: {len(df)} rows")
+            df = session.get('classified')
+            logger.info(f"거래량 특성 계산 완료: {len(df)} rows")
         except Exception as e:
             logger.error(f"데이터 수집 실패: {e}")
             return self._error_response(str(e))
         
-        # 2단계: 거래량 특성 계산
-        df = self.detector.calculate_volume_features(df)
-        logger.info("거래량 특성 계산 완료")
-        
-        # Event_Level 컬럼을 전체 DataFrame에 추가
-        def classify_event(ratio):
-            if pd.isna(ratio):
-                return None
-            if ratio >= self.detector.thresholds['extreme']:
-                return 'EXTREME'
-            elif ratio >= self.detector.thresholds['high']:
-                return 'HIGH'
-            elif ratio >= self.detector.thresholds['medium']:
-                return 'MEDIUM'
-            elif ratio >= self.detector.thresholds['alert']:
-                return 'ALERT'
-            return None
-        
-        df['Event_Level'] = df['Volume_Spike_Ratio'].apply(classify_event)
-        
         # 3단계: 이벤트 탐지
-        events = self.detector.detect_events(df, recent_days=EVENT_HISTORY_DAYS)
-        event_summary = self.detector.get_event_summary(events)
+        event_summary = session.get('summary')
         logger.info(f"이벤트 탐지 완료: {event_summary['total_events']}개")
         
         # 4단계: 최대 스파이크 찾기
-        cutoff_date = df['Date'].max() - pd.Timedelta(days=EVENT_HISTORY_DAYS)
-        top_spikes = self.detector.find_top_spikes(
-            df, 
-            top_n=10,
-            min_date=cutoff_date
-        )
+        top_spikes = session.get('top_spikes')
         
-        # 5단계: 개별 티커 분석 (이벤트 발생한 티커만)
-        event_tickers = events['Ticker'].unique() if not events.empty else []
-        ticker_analysis = {}
-        
-        for ticker in event_tickers[:5]:  # 상위 5개만
-            analysis = self.detector.analyze_ticker(df, ticker)
-            if analysis:
-                ticker_analysis[ticker] = analysis
+        # 5단계: 개별 티커 분석 (이벤트 발생한 티커 상위 5개)
+        ticker_analysis = session.get('ticker_analysis')
         
-        # 캐시 업데이트
-        self.data_cache = df
+        # 마지막 분석 시각
         self.last_update = datetime.now()
         
         # 최종 결과
@@ -162,14 +438,166 @@ class ETFAnalyzer:
         }
         
         logger.info("=== 파이프라인 완료 ===")
-        # JSON 직렬화 안전성 보장
-        return self._json_safe(result)
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='pipeline')
+        version = tuple(session.versions.get(ticker, 0) for ticker in tickers)
+        self.result_cache.set(self._result_key(tickers, period, version), result)
+        if include_timings:
+            return self._with_timings(result, session.timings, started)
+        return result
+    
+    def _run_sharded(
+        self,
+        tickers: List[str],
+        period: str,
+        started: float,
+        include_timings: bool,
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        프로세스 샤딩 파이프라인
+        
+        정렬한 티커를 연속 구간으로 나눠 샤드마다 수집/특성/분류를 별도 프로세스에서
+        실행하고, 이벤트 요약과 상위 스파이크를 병합한다. 결과 형태는 단일 프로세스와 같다.
+        데이터와 캐시는 워커 프로세스에 있으므로 결과 캐시는 쓰지 않는다.
+        """
+        ordered = sorted(dict.fromkeys(tickers))
+        shard_count = min(len(ordered), self.shard_workers * 2)  # 워커당 2개 (샤드별 소요 시간 편차 완화)
+        size = -(-len(ordered) // shard_count)
+        shards = [ordered[i:i + size] for i in range(0, len(ordered), size)]
+        logger.info(f"샤딩 분석: {len(shards)}개 샤드 / {self.shard_workers}개 프로세스")
+        
+        timings = {}
+        shard_started = time.perf_counter()
+        settings = self.shard_settings()
+        try:
+            results = [
+                result for result in self._shard_pool().map(
+                    _analyze_shard, shards, repeat(period), repeat(settings), repeat(force_refresh)
+                )
+                if result is not None
+            ]
+        except Exception as e:
+            logger.error(f"샤드 분석 실패: {e}")
+            return self._error_response(str(e))
+        timings['shards'] = time.perf_counter() - shard_started
+        STAGE_SECONDS.observe(timings['shards'], stage='shards')
+        
+        if not results:
+            return self._error_response("모든 티커 수집 실패")
+        
+        merge_started = time.perf_counter()
+        end = max(result['end'] for result in results)
+        cutoff_date = end - pd.Timedelta(days=EVENT_HISTORY_DAYS)
+        
+        # 이벤트: 전체 기준일로 다시 거른 뒤 요약 (샤드 순서 = 티커 정렬 순서)
+        events = pd.concat(
+            [result['events'][result['events']['Date'] >= cutoff_date] for result in results],
+            ignore_index=True
+        )
+        events['Ticker'] = pd.Categorical(events['Ticker'].astype(str), categories=ordered)
+        event_summary = self.detector.get_event_summary(events)
+        logger.info(f"이벤트 탐지 완료: {event_summary['total_events']}개")
+        
+        # 상위 스파이크: 샤드별 내림차순 후보 k-way merge
+        top = _merge_top(
+            [result['spikes'][result['spikes']['Date'] >= cutoff_date] for result in results],
+            'Volume_Spike_Ratio', 10
+        )
+        top_spikes = self.detector.find_top_spikes(top, top_n=10)
+        
+        # 이벤트 발생 티커 상위 5개: 샤드 결과에 없으면 (샤드 최종일이 전체보다 이른 경우) 직접 분석
+        shard_analysis = {}
+        for result in results:
+            shard_analysis.update(result['ticker_analysis'])
+        ticker_analysis = {}
+        for ticker in (events['Ticker'].unique()[:5] if not events.empty else []):
+            analysis = shard_analysis.get(ticker)
+            if analysis is None:
+                if force_refresh:
+                    self.collector.invalidate(ticker)
+                analysis = self.detector.analyze_ticker(self.session([ticker], period).get('classified'), ticker)
+            if analysis:
+                ticker_analysis[ticker] = analysis
+        timings['merge'] = time.perf_counter() - merge_started
+        STAGE_SECONDS.observe(timings['merge'], stage='merge')
+        
+        self.last_update = datetime.now()
+        
+        result = {
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'tickers_analyzed': len(tickers),
+                'data_rows': sum(result['rows'] for result in results),
+                'date_range': {
+                    'start': min(result['start'] for result in results).strftime('%Y-%m-%d'),
+                    'end': end.strftime('%Y-%m-%d')
+                },
+                'shards': len(shards),
+                'version': '0.2.0'
+            },
+            'summary': event_summary,
+            'top_spikes': top_spikes,
+            'ticker_analysis': ticker_analysis,
+            'etf_universe': {ticker: ALL_ETFS[ticker] for ticker in tickers if ticker in ALL_ETFS}
+        }
+        
+        logger.info("=== 샤딩 파이프라인 완료 ===")
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage='pipeline')
+        if include_timings:
+            return self._with_timings(result, timings, started)
+        return result
+    
+    def shard_settings(self) -> bytes:
+        """
+        샤드 워커가 같은 결과를 내도록 넘길 설정 (데이터 소스 + 탐지기 파라미터)
+        
+        워커는 값이 바뀌면 분석기를 새로 만들고, 같으면 기존 캐시를 재사용한다.
+        동시 다운로드 수는 프로세스 수로 나눠서 전체 업스트림 요청이 부모 설정을 넘지 않게 한다.
+        """
+        return pickle.dumps({
+            'source': self.collector.source,
+            'fetch_workers': max(1, self.collector.max_workers // self.shard_workers),
+            'detector': {
+                'ma_period': self.detector.ma_period,
+                'thresholds': dict(self.detector.thresholds),
+                'engine': self.detector.engine
+            }
+        })
+    
+    def _shard_pool(self) -> ProcessPoolExecutor:
+        """샤드 분석 프로세스 풀 (처음 사용할 때 생성)"""
+        with self._pool_lock:
+            if self._process_pool is None:
+                # 서버는 스레드를 여럿 쓰므로 fork 대신 spawn
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.shard_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=configure_pandas
+                )
+            return self._process_pool
+    
+    def shutdown(self) -> None:
+        """샤드 분석 프로세스 풀 + 수집기 다운로드 스레드 풀 종료"""
+        with self._pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(cancel_futures=True)
+                self._process_pool = None
+        self.collector.shutdown()
+    
+    def _with_timings(self, result: Dict, timings: Dict[str, float], started: float) -> Dict:
+        """metadata.timings 추가한 사본 (캐시에 저장된 결과 객체는 수정하지 않음)"""
+        block = {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+        block['total'] = round((time.perf_counter() - started) * 1000, 2)
+        return {**result, 'metadata': {**result['metadata'], 'timings': block}}
     
     def quick_scan(self, tickers: Optional[List[str]] = None) -> Dict:
         """
         빠른 스캔 (최근 5일 데이터만)
         실시간 모니터링용
         
+        티커별 증분 거래량 상태(VolumeState)에 새 봉만 반영하므로 자주 호출해도
+        히스토리 전체를 다시 계산하지 않는다. 스파이크 비율은 전체 분석과 같은 MA_PERIOD 이동평균 기준.
+        
         기본: 지수 3개 + 주요 섹터 8개 = 총 11개
         """
         if tickers is None:
@@ -178,21 +606,20 @@ class ETFAnalyzer:
             tickers = QUICK_SCAN_ETFS
         
         try:
-            df = self.collector.fetch_multiple(tickers, period="5d")
-            df = self.detector.calculate_volume_features(df)
+            rows = self._live_rows(tickers)
             
             latest_data = []
             for ticker in tickers:
-                ticker_df = df[df['Ticker'] == ticker]
-                if not ticker_df.empty:
-                    latest = ticker_df.iloc[-1]
+                latest = rows.get(ticker)
+                if latest is not None:
                     latest_data.append({
                         'ticker': ticker,
                         'name': ALL_ETFS.get(ticker, 'Unknown'),
                         'price': round(latest['Close'], 2),
                         'volume': int(latest['Volume']),
                         'volume_spike_ratio': round(latest['Volume_Spike_Ratio'], 2) if not pd.isna(latest['Volume_Spike_Ratio']) else None,
-                        'price_change_pct': round(latest['Price_Change_Pct'], 2) if not pd.isna(latest['Price_Change_Pct']) else None
+                        'price_change_pct': round(latest['Price_Change_Pct'], 2) if not pd.isna(latest['Price_Change_Pct']) else None,
+                        'event_level': latest['Event_Level']
                     })
             
             result = {
@@ -200,12 +627,186 @@ class ETFAnalyzer:
                 'mode': 'quick_scan',
                 'data': latest_data
             }
-            return self._json_safe(result)
+            return result
         
         except Exception as e:
             logger.error(f"빠른 스캔 실패: {e}")
             return self._error_response(str(e))
     
+    def _live_rows(self, tickers: List[str]) -> Dict[str, Dict]:
+        """
+        티커별 최신 봉 특성 + Event_Level (증분 상태 갱신)
+        
+        상태가 있는 티커는 최근 5일 봉 중 마지막 반영일 이후 봉만 update_state로 반영하고,
+        상태가 없거나 마지막 반영일이 5일 구간보다 오래된 티커는 LIVE_STATE_PERIOD 히스토리로
+        build_state 한다.
+        """
+        recent = self.collector.fetch_multiple(tickers, period="5d")
+        rows = {}
+        stale = []
+        
+        with self._live_lock:
+            for ticker, ticker_df in recent.groupby('Ticker', sort=False, observed=True):
+                state = self._live_states.get(ticker)
+                if (
+                    state is None
+                    or state.ma_period != self.detector.ma_period
+                    or state.last_date < ticker_df['Date'].iloc[0]
+                ):
+                    stale.append(ticker)
+                    continue
+                
+                new = ticker_df[ticker_df['Date'] >= state.last_date]
+                for date, close, volume in zip(new['Date'], new['Close'], new['Volume']):
+                    self.detector.update_state(state, date, close, volume)
+                rows[ticker] = self.detector.state_row(state)
+        
+        if stale:
+            history = self.collector.fetch_multiple(stale, period=LIVE_STATE_PERIOD)
+            with self._live_lock:
+                for ticker, ticker_df in history.groupby('Ticker', sort=False, observed=True):
+                    state = self.detector.build_state(ticker_df, ticker)
+                    self._live_states[ticker] = state
+                    rows[ticker] = self.detector.state_row(state)
+        
+        return rows
+    
+    def ticker_detail(
+        self,
+        ticker: str,
+        period: str = "1y",
+        layout: str = "rows",
+        max_points: Optional[int] = None
+    ) -> Dict:
+        """
+        티커 상세 데이터 (가격/거래량 히스토리 + 스파이크 이벤트)
+        
+        Args:
+            ticker: 티커
+            period: 데이터 기간
+            layout: rows = 행 단위 [{date, close, ...}], columns = 컬럼 단위 {date: [...], close: [...]}
+            max_points: 히스토리 최대 포인트 수 (3 이상, 초과 시 다운샘플링, None이면 전체)
+        
+        Returns:
+            상세 데이터 (데이터 없으면 None)
+        """
+        try:
+            df = self.session([ticker], period).get('features')
+        except ValueError as e:
+            logger.warning(f"{ticker} 상세 데이터 없음: {e}")
+            return None
+        
+        return self._build_ticker_detail(df, ticker, layout, max_points) if not df.empty else None
+    
+    def ticker_details(
+        self,
+        tickers: List[str],
+        period: str = "1y",
+        layout: str = "rows",
+        max_points: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        여러 티커 상세 데이터 (비교 화면용)
+        
+        병렬 수집 후 거래량 특성을 전체 티커에 대해 한 번에 계산하고 티커별로 나눈다.
+        
+        Args:
+            tickers: 티커 리스트 (중복 제거, 요청 순서 유지)
+            period, layout, max_points: ticker_detail과 동일
+        
+        Returns:
+            {'period': ..., 'tickers': {티커: ticker_detail 형태}, 'missing': [데이터 없는 티커]}
+            모든 티커 데이터가 없으면 None
+        """
+        tickers = list(dict.fromkeys(tickers))
+        
+        try:
+            df = self.session(tickers, period).get('features')
+        except ValueError as e:
+            logger.warning(f"{tickers} 상세 데이터 없음: {e}")
+            return None
+        
+        details = {
+            ticker: self._build_ticker_detail(ticker_df, ticker, layout, max_points)
+            for ticker, ticker_df in df.groupby('Ticker', sort=False, observed=True)
+        }
+        if not details:
+            return None
+        
+        return {
+            'period': period,
+            'tickers': {ticker: details[ticker] for ticker in tickers if ticker in details},
+            'missing': [ticker for ticker in tickers if ticker not in details]
+        }
+    
+    def _build_ticker_detail(
+        self,
+        df: pd.DataFrame,
+        ticker: str,
+        layout: str = "rows",
+        max_points: Optional[int] = None
+    ) -> Dict:
+        """단일 티커 특성 DataFrame → 상세 응답 (행 반복 없이 컬럼 단위 변환)"""
+        if max_points is not None and max_points < 3:
+            raise ValueError(f"max_points는 3 이상이어야 합니다: {max_points}")
+        convert = frame_to_columns if layout == "columns" else frame_to_records
+        
+        history = df[['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Volume_MA', 'Volume_Spike_Ratio']]
+        if max_points and len(history) > max_points:
+            history = self._downsample_history(history, max_points)
+        history = display_prices(history).rename(columns={
+            'Date': 'date', 'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close',
+            'Volume': 'volume', 'Volume_MA': 'volume_ma', 'Volume_Spike_Ratio': 'volume_spike_ratio'
+        })
+        
+        # 스파이크 이벤트 (MEDIUM 이상, 최근 20개)
+        levels = self.detector.classify_events(df['Volume_Spike_Ratio'])
+        is_event = (levels >= 'MEDIUM').to_numpy()
+        spikes = df[is_event].iloc[::-1].head(20)
+        events = pd.DataFrame({
+            'date': spikes['Date'],
+            'level': levels[is_event].iloc[::-1].head(20).astype(str).str.lower(),
+            'ratio': spikes['Volume_Spike_Ratio'],
+            'volume': spikes['Volume'],
+            'price': spikes['Close'],
+            'price_change': spikes['Close'] - spikes['Open']
+        })
+        
+        latest = df.iloc[-1]
+        
+        return {
+            "ticker": ticker,
+            "name": ticker,  # TODO: 실제 이름 매핑
+            "latest": {
+                "date": latest['Date'].strftime('%Y-%m-%d'),
+                "price": to_float(latest['Close']),
+                "volume": int(latest['Volume']),
+                "volume_spike_ratio": to_float(latest['Volume_Spike_Ratio']),
+                "price_change": to_float(latest['Close'] - latest['Open']),
+                "price_change_pct": to_float((latest['Close'] - latest['Open']) / latest['Open'] * 100)
+            },
+            "history": convert(history, '%Y-%m-%d'),
+            "events": convert(events, '%Y-%m-%d')
+        }
+    
+    def _downsample_history(self, history: pd.DataFrame, max_points: int) -> pd.DataFrame:
+        """
+        히스토리를 max_points개로 축소
+        
+        종가 LTTB로 포인트를 고르고, 각 포인트가 대표하는 구간에서
+        High/Volume/Volume_Spike_Ratio는 최대값, Low는 최소값을 취해
+        가격 범위와 거래량 스파이크가 사라지지 않게 한다.
+        """
+        indices = lttb_indices(history['Close'].to_numpy(dtype=float), max_points)
+        starts = segment_starts(indices, len(history))
+        
+        return history.iloc[indices].assign(
+            High=bucket_max(history['High'].to_numpy(), starts).astype(history['High'].dtype),
+            Low=bucket_min(history['Low'].to_numpy(), starts).astype(history['Low'].dtype),
+            Volume=bucket_max(history['Volume'].to_numpy(), starts).astype(np.int64),
+            Volume_Spike_Ratio=bucket_max(history['Volume_Spike_Ratio'].to_numpy(), starts)
+        )
+    
     def _error_response(self, error_msg: str) -> Dict:
         """에러 응답 생성"""
         return {
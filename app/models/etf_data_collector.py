@@ -1,105 +1,446 @@
 """
 ETF 데이터 수집 모듈
-yfinance를 사용하여 실시간 ETF 데이터 수집
+데이터 소스(기본 yfinance)에서 ETF 데이터 수집
 """
-from datetime import datetime, timedelta
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import itertools
+import threading
+import time
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from typing import List, Dict, Optional
+from typing import Any, Callable, Hashable, List, Dict, Optional, Tuple
 import logging
 
+from models.data_cache import DataFrameCache
+from models.data_sources import DataSource, YFinanceSource, period_window
+from models.ohlcv_schema import compact_ohlcv, concat_tickers
+from models.ohlcv_store import OHLCVStore, merge_history
+from services.metrics import COLLECTOR_SECONDS, UPSTREAM_ERRORS, UPSTREAM_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# 저장된 히스토리의 첫 봉이 요청 구간 시작일보다 이 기간 이내로 늦으면
+# 휴장일 때문으로 보고 구간을 커버한 것으로 간주
+_COVERAGE_TOLERANCE = pd.Timedelta(days=5)
+
+
+def _naive_date(ts: pd.Timestamp) -> pd.Timestamp:
+    """타임존 제거 후 자정으로 정규화"""
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.normalize()
+
 class ETFDataCollector:
     """ETF OHLCV 데이터 수집기"""
     
-    def __init__(self):
-        self.cache = {}
-        self.cache_timestamp = {}
-        self.cache_ttl = 300  # 5분 캐시
+    def __init__(
+        self,
+        max_workers: int = 8,
+        store_dir: Optional[str] = None,
+        cache_ttl: float = 300,
+        cache_max_entries: int = 256,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        source: Optional[DataSource] = None
+    ):
+        """
+        Args:
+            max_workers: 동시 다운로드 최대 스레드 수 (수집기 전체 공유 - 동시에 들어온
+                fetch_multiple 호출들을 합쳐도 이 수를 넘지 않음)
+            store_dir: OHLCV 로컬 저장소 경로 (None이면 디스크 저장 안 함)
+            cache_ttl: 메모리 캐시 유효 시간 (초, 기본 5분)
+            cache_max_entries: 메모리 캐시 최대 항목 수
+            cache_max_bytes: 메모리 캐시 최대 크기 (bytes)
+            source: OHLCV 데이터 소스 (None이면 yfinance)
+        """
+        self.cache = DataFrameCache(
+            ttl=cache_ttl,
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes
+        )
+        self.max_workers = max_workers
+        # 호출마다 풀을 만들면 동시 요청 수만큼 업스트림 요청이 늘어나므로 하나를 계속 사용
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='fetch')
+        self.source = source or YFinanceSource()
+        # 로컬 소스(replay/synthetic)는 디스크 저장소가 필요 없음
+        self.store = OHLCVStore(store_dir) if store_dir and self.source.is_remote else None
+        self._listed_since = {}  # 티커별 업스트림 최초 데이터 일자 (이전 구간 재요청 방지)
+        self._inflight: Dict[Hashable, Future] = {}  # 진행 중인 다운로드 (요청 병합용)
+        self._inflight_lock = threading.Lock()
+        self._versions: Dict[str, int] = {}  # 티커별 데이터 버전 (새 데이터 반영 시 증가)
+        self._version_seq = itertools.count(1)
+        self._version_lock = threading.Lock()  # 캐시 항목과 버전을 함께 읽고 쓰기
+        # 캐시 key별 마지막 저장 데이터 지문 (TTL 만료로 항목이 사라져도 유지, 같은 데이터 재저장 시 버전 유지)
+        self._fingerprints: Dict[tuple, Tuple[int, int]] = {}
+        self._listeners: List[Callable[[str], None]] = []
     
     def fetch_data(
         self, 
         ticker: str, 
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        period: str = "1y"
+        period: str = "1y",
+        versions: Optional[Dict[str, int]] = None
     ) -> pd.DataFrame:
         """
         단일 ETF 데이터 수집
         
+        period 요청은 티커별 히스토리 하나를 공유한다. 캐시된 히스토리가
+        요청 구간을 포함하면 잘라서 반환하고(복사/다운로드 없음), 부족한
+        구간만 추가로 받아 히스토리를 확장한다.
+        반환되는 DataFrame은 캐시와 메모리를 공유한다 (Copy-on-Write이므로
+        컬럼 추가/수정은 원본에 영향 없음).
+        
         Args:
             ticker: ETF 티커 심볼
             start_date: 시작일 (YYYY-MM-DD)
             end_date: 종료일 (YYYY-MM-DD)
             period: 기간 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+            versions: 주어지면 반환 데이터의 버전 기록 (티커 → 버전, 이후 갱신과 무관)
         
         Returns:
             DataFrame with OHLCV data
         """
         try:
-            # 캐시 확인
-            cache_key = f"{ticker}_{period}_{start_date}_{end_date}"
-            if cache_key in self.cache:
-                if (datetime.now() - self.cache_timestamp[cache_key]).seconds < self.cache_ttl:
-                    logger.info(f"캐시에서 {ticker} 데이터 로드")
-                    return self.cache[cache_key].copy()
-            
-            # yfinance로 데이터 다운로드
-            etf = yf.Ticker(ticker)
-            
-            if start_date and end_date:
-                df = etf.history(start=start_date, end=end_date)
-            else:
-                df = etf.history(period=period)
+            with COLLECTOR_SECONDS.time(method='fetch_data'):
+                if start_date and end_date:
+                    df, version = self._single_flight(
+                        (ticker, start_date, end_date),
+                        lambda: self._fetch_range(ticker, start_date, end_date)
+                    )
+                else:
+                    history, version = self._single_flight(
+                        (ticker, period),
+                        lambda: self._get_history(ticker, period)
+                    )
+                    df = self._slice_period(history, period)
             
             if df.empty:
                 raise ValueError(f"{ticker} 데이터 없음")
             
-            df = df.reset_index()
-            df['Ticker'] = ticker
-            
-            # 캐시 저장
-            self.cache[cache_key] = df.copy()
-            self.cache_timestamp[cache_key] = datetime.now()
-            
-            logger.info(f"{ticker} 데이터 수집 완료: {len(df)} rows")
+            if versions is not None:
+                versions[ticker] = version
             return df
             
         except Exception as e:
             logger.error(f"{ticker} 데이터 수집 실패: {e}")
             raise
     
+    def shutdown(self) -> None:
+        """다운로드 스레드 풀 종료 (대기 중인 다운로드 취소)"""
+        self._executor.shutdown(cancel_futures=True)
+    
+    def invalidate(self, ticker: Optional[str] = None) -> int:
+        """
+        메모리 캐시 무효화
+        
+        Args:
+            ticker: 해당 티커 항목만 삭제 (None이면 전체 삭제)
+        
+        Returns:
+            삭제된 항목 수
+        """
+        if ticker is None:
+            return self.cache.invalidate()
+        return self.cache.invalidate(lambda key: key[0] == ticker)
+    
+    def cache_stats(self) -> Dict:
+        """메모리 캐시 통계 (hits/misses/evictions/expirations/entries/bytes)"""
+        return self.cache.stats()
+    
+    def data_version(self, tickers: List[str]) -> Tuple[int, ...]:
+        """티커별 데이터 버전 (수집한 적 없으면 0)"""
+        return tuple(self._versions.get(ticker, 0) for ticker in tickers)
+    
+    def fresh_version(self, tickers: List[str], period: str) -> Optional[Tuple[int, ...]]:
+        """
+        다운로드 없이 응답 가능한 경우의 데이터 버전
+        
+        모든 티커의 히스토리가 메모리 캐시에 유효하고 period를 커버하면
+        data_version(tickers), 하나라도 업스트림 조회가 필요하면 None.
+        """
+        for ticker in tickers:
+            history = self.cache.peek((ticker,))
+            if history is None or not self._covers(ticker, history, period):
+                return None
+        return self.data_version(tickers)
+    
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """새 데이터 반영 시 호출할 콜백 등록 (인자: 티커)"""
+        self._listeners.append(callback)
+    
+    def _read_cached(self, key: tuple) -> Tuple[Optional[pd.DataFrame], int]:
+        """캐시 항목 + 그 데이터의 버전"""
+        with self._version_lock:
+            return self.cache.get(key), self._versions.get(key[0], 0)
+    
+    def _store(self, key: tuple, df: pd.DataFrame, merge: bool = False) -> Tuple[pd.DataFrame, int]:
+        """
+        캐시 저장 + 버전 증가 (다른 스레드가 그 사이에 버전만 올리지 못하도록 함께 처리)
+        
+        마지막으로 저장한 데이터와 같으면 (TTL 만료 후 다시 받은 같은 봉) 버전을 올리지 않아
+        특성/결과 캐시가 무효화되지 않는다.
+        
+        Args:
+            merge: 그 사이 다른 요청이 저장한 항목이 있으면 합쳐서 보존 (히스토리)
+        
+        Returns:
+            (저장한 DataFrame, 버전)
+        """
+        ticker = key[0]
+        with self._version_lock:
+            if merge:
+                current = self.cache.peek(key)
+                if current is not None and current is not df:
+                    df = merge_history(current, df)
+            self.cache.set(key, df)
+            fingerprint = self._fingerprint(df)
+            changed = self._fingerprints.get(key) != fingerprint or ticker not in self._versions
+            if changed:
+                self._fingerprints[key] = fingerprint
+                self._versions[ticker] = next(self._version_seq)
+            version = self._versions[ticker]
+        if changed:
+            self._notify(ticker)
+        return df, version
+    
+    @staticmethod
+    def _fingerprint(df: pd.DataFrame) -> Tuple[int, int]:
+        """(행 수, 내용 해시) - 과거 봉 수정(배당/분할 조정)까지 감지하도록 전체 행 해시"""
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return len(df), int(hashes.sum(dtype=np.uint64))
+    
+    def _notify(self, ticker: str) -> None:
+        for callback in self._listeners:
+            try:
+                callback(ticker)
+            except Exception as e:
+                logger.warning(f"데이터 갱신 콜백 실패: {e}")
+    
+    def _single_flight(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        동일 key 요청 병합
+        
+        같은 key로 이미 진행 중인 조회가 있으면 새로 다운로드하지 않고
+        그 결과(또는 예외)를 함께 받는다. 캐시 만료 직후 동시 요청이
+        업스트림으로 몰리는 것을 방지.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_leader:
+            logger.info(f"진행 중인 {key[0]} 조회 결과 대기")
+            return future.result()
+        
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    def _download(self, ticker: str, **kwargs) -> pd.DataFrame:
+        """데이터 소스 다운로드 (Date 컬럼 + Ticker 컬럼 형태로 변환)"""
+        started = time.perf_counter()
+        try:
+            df = self.source.history(ticker, **kwargs)
+        except Exception:
+            UPSTREAM_ERRORS.inc(source=self.source.name, ticker=ticker)
+            raise
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, source=self.source.name, ticker=ticker)
+        
+        if df.empty:
+            return df
+        
+        return compact_ohlcv(df.reset_index(), ticker)
+    
+    def _fetch_range(self, ticker: str, start_date: str, end_date: str) -> Tuple[pd.DataFrame, int]:
+        """명시적 기간 조회 (기간별 개별 캐시), (데이터, 버전) 반환"""
+        cache_key = (ticker, start_date, end_date)
+        cached, version = self._read_cached(cache_key)
+        if cached is not None:
+            logger.info(f"캐시에서 {ticker} 데이터 로드")
+            return cached, version
+        
+        df = self._download(ticker, start=start_date, end=end_date)
+        if not df.empty:
+            df, version = self._store(cache_key, df)
+            logger.info(f"{ticker} 데이터 수집 완료: {len(df)} rows")
+        return df, version
+    
+    def _get_history(self, ticker: str, period: str) -> Tuple[pd.DataFrame, int]:
+        """
+        period를 커버하는 티커 히스토리 조회
+        
+        1. 메모리 캐시 (TTL 이내) → 없으면 로컬 저장소 + 마지막 저장일 이후 봉 append
+        2. 히스토리가 요청 구간보다 짧으면 빠진 앞부분만 추가 다운로드
+        마지막 저장일부터 다시 받는 이유는 장중에 저장된 미완성 봉을
+        확정 봉으로 교체하기 위함.
+        
+        Returns:
+            (히스토리, 히스토리의 데이터 버전)
+        """
+        cache_key = (ticker,)
+        history, version = self._read_cached(cache_key)
+        in_memory = history is not None
+        changed = False
+        
+        if history is None and self.store is not None:
+            history = self.store.load(ticker)
+            if history is not None:
+                history = compact_ohlcv(history, ticker)  # 이전 스키마로 저장된 파일 대응
+                history, changed = self._append_recent(ticker, history)
+        
+        if history is None or not self._covers(ticker, history, period):
+            history = self._extend_history(ticker, history, period)
+            changed = True
+        elif in_memory:
+            logger.info(f"캐시에서 {ticker} 데이터 로드")
+        
+        if (changed or not in_memory) and not history.empty:
+            # 다른 period 요청이 그 사이 히스토리를 갱신했으면 합쳐서 보존
+            history, version = self._store(cache_key, history, merge=True)
+            if changed and self.store is not None:
+                self.store.save(ticker, history)
+            logger.info(f"{ticker} 데이터 수집 완료: {len(history)} rows")
+        
+        return history, version
+    
+    def _append_recent(self, ticker: str, history: pd.DataFrame) -> Tuple[pd.DataFrame, bool]:
+        """마지막 저장일 이후의 봉만 받아 append (실패 시 기존 히스토리 유지)"""
+        last_date = history['Date'].iloc[-1]
+        
+        try:
+            new = self._download(ticker, start=last_date.strftime('%Y-%m-%d'))
+        except Exception as e:
+            logger.warning(f"{ticker} 증분 업데이트 실패, 저장 데이터 사용: {e}")
+            return history, False
+        
+        logger.info(f"{ticker} 증분 업데이트: {len(new)} rows")
+        return merge_history(history, new), True
+    
+    def _extend_history(
+        self,
+        ticker: str,
+        history: Optional[pd.DataFrame],
+        period: str
+    ) -> pd.DataFrame:
+        """히스토리에 없는 구간만 다운로드해서 병합"""
+        start, bars = period_window(period, self.source.now())
+        
+        if history is not None and start is not None:
+            # 빠진 앞부분만 (start ~ 첫 봉 전날)
+            first_date = history['Date'].iloc[0]
+            missing = self._download(
+                ticker,
+                start=start.strftime('%Y-%m-%d'),
+                end=first_date.strftime('%Y-%m-%d')
+            )
+        else:
+            missing = self._download(ticker, period=period)
+        
+        merged = merge_history(history, missing)
+        
+        # 요청 시작일보다 늦게 시작하면 그 이전 데이터는 업스트림에도 없음 (상장일)
+        if not merged.empty:
+            first_date = _naive_date(merged['Date'].iloc[0])
+            if bars is None and (start is None or first_date > start + _COVERAGE_TOLERANCE):
+                self._listed_since[ticker] = first_date
+        
+        return merged
+    
+    def _covers(self, ticker: str, history: pd.DataFrame, period: str) -> bool:
+        """히스토리가 period 구간 전체를 포함하는지 여부"""
+        start, bars = period_window(period, self.source.now())
+        
+        if bars is not None:
+            return len(history) >= bars
+        
+        first_date = _naive_date(history['Date'].iloc[0])
+        listed_since = self._listed_since.get(ticker)
+        if listed_since is not None and first_date <= listed_since:
+            return True  # 상장일부터 전부 보유
+        if start is None:
+            return False  # 'max'는 상장일을 알기 전까지 전체 수집
+        
+        return first_date <= start + _COVERAGE_TOLERANCE
+    
+    def _slice_period(self, history: pd.DataFrame, period: str) -> pd.DataFrame:
+        """히스토리에서 period 구간만 잘라냄 (iloc 슬라이스, 복사 없음)"""
+        if history.empty:
+            return history
+        
+        start, bars = period_window(period, self.source.now())
+        
+        if bars is not None:
+            return history.iloc[-bars:]
+        if start is None:
+            return history
+        
+        dates = history['Date']
+        if dates.dt.tz is not None:
+            start = start.tz_localize(dates.dt.tz)
+        return history.iloc[dates.searchsorted(start):]
+    
     def fetch_multiple(
         self, 
         tickers: List[str],
-        period: str = "1y"
+        period: str = "1y",
+        max_workers: Optional[int] = None,
+        versions: Optional[Dict[str, int]] = None
     ) -> pd.DataFrame:
         """
         여러 ETF 데이터 동시 수집
         
+        티커별 다운로드를 수집기 공유 스레드 풀에서 병렬로 실행하므로 전체 소요 시간은
+        가장 느린 티커 하나에 수렴한다. 실패한 티커는 개별적으로 스킵된다.
+        
         Args:
             tickers: ETF 티커 리스트
             period: 기간
+            max_workers: 이 호출의 최대 동시 다운로드 수 (None이면 self.max_workers,
+                공유 풀 크기를 넘을 수 없음)
+            versions: 주어지면 수집한 티커별 데이터 버전 기록 (fetch_data와 동일)
         
         Returns:
-            Combined DataFrame
+            Combined DataFrame (입력 티커 순서 유지, 표준 스키마 - models.ohlcv_schema)
         """
-        frames = []
-        failed = []
+        workers = max_workers or self.max_workers
+        workers = max(1, min(workers, len(tickers)))
         
-        for ticker in tickers:
+        def _fetch(ticker: str) -> Optional[pd.DataFrame]:
             try:
-                df = self.fetch_data(ticker, period=period)
-                frames.append(df)
+                return self.fetch_data(ticker, period=period, versions=versions)
             except Exception as e:
                 logger.warning(f"{ticker} 스킵: {e}")
-                failed.append(ticker)
+                return None
+        
+        with COLLECTOR_SECONDS.time(method='fetch_multiple'):
+            # 이 호출의 미완료 작업을 workers개 이하로 유지하며 공유 풀에 제출
+            futures = {}
+            pending = set()
+            for ticker in tickers:
+                if len(pending) >= workers:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                future = self._executor.submit(_fetch, ticker)
+                futures[ticker] = future
+                pending.add(future)
+            results = [futures[ticker].result() for ticker in tickers]
+        
+        frames = {ticker: df for ticker, df in zip(tickers, results) if df is not None}
+        failed = [ticker for ticker, df in zip(tickers, results) if df is None]
         
         if not frames:
             raise ValueError("모든 티커 수집 실패")
         
-        combined = pd.concat(frames, ignore_index=True)
+        combined = concat_tickers(frames)
         
         if failed:
             logger.warning(f"실패한 티커: {failed}")
@@ -120,9 +461,7 @@ class ETFDataCollector:
             }
         """
         try:
-            etf = yf.Ticker(ticker)
-            info = etf.info
-            hist = etf.history(period="2d")
+            hist = self.source.history(ticker, period="2d")
             
             if len(hist) < 2:
                 raise ValueError("데이터 부족")
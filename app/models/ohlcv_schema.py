@@ -0,0 +1,74 @@
+"""
+OHLCV 패널 표준 스키마
+수집 직후 한 번 변환해서 캐시/저장소/분석 전 단계가 같은 compact 형태를 공유
+
+- 컬럼: Date, Open, High, Low, Close, Volume, Ticker (Dividends / Stock Splits /
+  Capital Gains 등 쓰지 않는 컬럼은 제거)
+- 가격: float64 (저장소/캐시는 원본 정밀도 유지, 응답용 사본만 display_prices로 float32)
+- 거래량: 원본 정수형 유지 (int64, 일부 ETF는 int32 범위 초과 가능)
+- Ticker: categorical (행마다 문자열 대신 정수 코드)
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+OHLCV_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+PRICE_DTYPE = np.float64
+DISPLAY_PRICE_DTYPE = np.float32
+
+
+def compact_ohlcv(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """
+    단일 티커 OHLCV → 표준 스키마
+
+    Args:
+        df: Date 컬럼이 있는 OHLCV DataFrame (yfinance history().reset_index() 형태)
+        ticker: 티커
+
+    Returns:
+        표준 스키마 DataFrame (Ticker는 카테고리 1개짜리 categorical)
+    """
+    columns = [column for column in OHLCV_COLUMNS if column in df.columns]
+    df = df[columns].astype({column: PRICE_DTYPE for column in PRICE_COLUMNS if column in columns})
+    df['Ticker'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[ticker])
+    return df
+
+
+def display_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    응답용 사본의 가격 컬럼을 float32로 축소
+
+    저장소/캐시 프레임에는 쓰지 않는다 (한 번 잃은 정밀도는 되돌릴 수 없음).
+    ETF 가격대에서 유효숫자 7자리면 소수 2자리 응답에 충분하다.
+    """
+    return df.astype({column: DISPLAY_PRICE_DTYPE for column in PRICE_COLUMNS if column in df.columns})
+
+
+def concat_tickers(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    티커별 DataFrame → 하나의 패널
+
+    카테고리가 서로 다른 categorical을 그대로 concat하면 object로 풀리므로
+    Ticker를 떼고 합친 뒤 코드 배열로 다시 만든다.
+
+    Args:
+        frames: 티커 → 해당 티커 DataFrame (Ticker 컬럼 포함, 이 순서로 이어 붙임)
+
+    Returns:
+        패널 DataFrame (Ticker 카테고리는 티커 정렬 순 - 정렬 결과가 문자열 정렬과 같도록)
+    """
+    categories = sorted(frames)
+    position = {ticker: i for i, ticker in enumerate(categories)}
+    ticker_loc = next(iter(frames.values())).columns.get_loc('Ticker')
+
+    combined = pd.concat(
+        [df.drop(columns='Ticker') for df in frames.values()],
+        ignore_index=True
+    )
+    codes = np.repeat(
+        np.array([position[ticker] for ticker in frames], dtype=np.int32),
+        [len(df) for df in frames.values()]
+    )
+    combined.insert(ticker_loc, 'Ticker', pd.Categorical.from_codes(codes, categories=categories))
+    return combined
@@ -0,0 +1,89 @@
+"""
+OHLCV 로컬 저장소
+티커별 일봉 히스토리를 디스크에 보관 (수집기가 새 봉을 병합해서 통째로 저장)
+"""
+from pathlib import Path
+import os
+import tempfile
+import pandas as pd
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PARQUET = True
+except ImportError:  # pyarrow 미설치 시 pickle로 대체
+    _HAS_PARQUET = False
+
+
+class OHLCVStore:
+    """
+    티커별 OHLCV 파일 저장소
+
+    - 티커 1개 = 파일 1개 (Parquet, pyarrow 없으면 pickle)
+    - 날짜 오름차순 정렬, Date 기준 중복 없음
+    - 쓰기는 임시 파일 → rename으로 원자적 교체
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 저장 디렉토리 (없으면 생성)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.suffix = ".parquet" if _HAS_PARQUET else ".pkl"
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.upper()}{self.suffix}"
+
+    def load(self, ticker: str) -> Optional[pd.DataFrame]:
+        """저장된 히스토리 로드 (없거나 손상된 경우 None)"""
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+
+        try:
+            if _HAS_PARQUET:
+                df = pd.read_parquet(path)
+            else:
+                df = pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"{ticker} 저장 데이터 로드 실패, 무시: {e}")
+            return None
+
+        return df if not df.empty else None
+
+    def save(self, ticker: str, df: pd.DataFrame) -> None:
+        """히스토리 전체 저장 (기존 파일 교체)"""
+        path = self._path(ticker)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=self.suffix)
+        os.close(fd)
+
+        try:
+            if _HAS_PARQUET:
+                df.to_parquet(tmp, index=False)
+            else:
+                df.to_pickle(tmp)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+def merge_history(
+    old: Optional[pd.DataFrame],
+    new: Optional[pd.DataFrame]
+) -> pd.DataFrame:
+    """두 히스토리를 Date 기준으로 병합 (중복 날짜는 new 우선)"""
+    if old is None or old.empty:
+        return new.reset_index(drop=True)
+    if new is None or new.empty:
+        return old
+
+    merged = pd.concat([old, new], ignore_index=True)
+    merged = merged.drop_duplicates(subset='Date', keep='last')
+    return merged.sort_values('Date').reset_index(drop=True)
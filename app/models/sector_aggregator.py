@@ -6,8 +6,10 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 import logging
+import warnings
 
 from config.etf_universe import SECTOR_ETFS
+from models.ticker_panel import TickerPanel
 
 logger = logging.getLogger(__name__)
 
@@ -118,6 +120,52 @@ class SectorAggregator:
             'percentile': round(float(percentile), 1)
         }
     
+    def calculate_volume_stats_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        전 티커 거래량 통계 일괄 계산 (calculate_volume_stats의 벡터화 버전)
+        
+        티커별 거래량을 마지막 봉 기준으로 오른쪽 정렬한 (관측 순번 × 티커)
+        패널을 만들고, 각 기간의 꼬리 구간 통계를 열 단위로 한 번에 계산한다.
+        
+        Args:
+            df: Ticker, Date, Volume 컬럼을 가진 DataFrame
+        
+        Returns:
+            티커 인덱스, calculate_volume_stats와 같은 키의 컬럼 (반올림 전)
+        """
+        df = df.sort_values(['Ticker', 'Date'], kind='stable')
+        # 각 티커의 마지막 봉이 패널 마지막 행에 오도록 배치
+        layout = TickerPanel(df['Ticker'], align='end')
+        lengths = layout.lengths
+        panel = layout.to_panel(df['Volume'].to_numpy(dtype=float, na_value=np.nan))
+        
+        current = panel[-1]
+        stats = {}
+        
+        # 관측치 1개 이하 열의 nanstd 경고 무시 (해당 Z-Score는 0 처리)
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for name, period in (
+                ('short', self.short_period),
+                ('medium', self.medium_period),
+                ('long', self.long_period)
+            ):
+                tail = panel[-period:]
+                mean = np.nanmean(tail, axis=0)
+                std = np.nanstd(tail, axis=0, ddof=1)
+                
+                zscore = (current - mean) / std
+                zscore = np.where((std == 0) | np.isnan(std), 0.0, zscore)
+                # 유효 기간(min(period, 길이))이 5일 미만이면 0
+                stats[f'{name}_zscore'] = np.where(np.minimum(period, lengths) < 5, 0.0, zscore)
+                stats[f'{name}_spike'] = np.where(mean > 0, current / mean, 1.0)
+            
+            long_rows = np.minimum(self.long_period, lengths)
+            below = (panel[-self.long_period:] < current).sum(axis=0)
+            stats['percentile'] = below / long_rows * 100
+        
+        return pd.DataFrame(stats, index=pd.Index(layout.tickers, name='Ticker'))
+    
     def classify_signal(self, stats: Dict) -> Tuple[str, str]:
         """
         Z-Score 기반 시그널 분류
@@ -127,36 +175,41 @@ class SectorAggregator:
             signal_type: ACCUMULATION, BREAKOUT, OVERHEATED, DISTRIBUTION, NEUTRAL
             status: extreme, hot, warm, active, normal, cool, cold
         """
-        short_z = stats['short_zscore']
-        long_z = stats['long_zscore']
-        
-        # 시그널 분류
-        signal = 'NEUTRAL'
+        signals, statuses = self.classify_signals(
+            np.array([stats['short_zscore']]),
+            np.array([stats['long_zscore']])
+        )
+        return str(signals[0]), str(statuses[0])
+    
+    def classify_signals(
+        self,
+        short_z: np.ndarray,
+        long_z: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Z-Score 기반 시그널/상태 분류 (벡터화)
         
-        if short_z > 3.0:
-            signal = 'OVERHEATED'      # 🔥🔥 과열 경고
-        elif short_z > 2.0 and long_z > 1.0:
-            signal = 'BREAKOUT'        # 🚀 자금 유입 가속
-        elif short_z > 1.5 and long_z < 1.0:
-            signal = 'ACCUMULATION'    # 🟢 자금 유입 시작
-        elif short_z < -1.0 and long_z > 1.0:
-            signal = 'DISTRIBUTION'    # 🔴 자금 이탈
+        Returns:
+            (signal 배열, status 배열) - 값 정의는 classify_signal과 동일
+        """
+        # 시그널 분류 (위에서부터 우선)
+        signal = np.select(
+            [
+                short_z > 3.0,                        # 🔥🔥 과열 경고
+                (short_z > 2.0) & (long_z > 1.0),     # 🚀 자금 유입 가속
+                (short_z > 1.5) & (long_z < 1.0),     # 🟢 자금 유입 시작
+                (short_z < -1.0) & (long_z > 1.0)     # 🔴 자금 이탈
+            ],
+            ['OVERHEATED', 'BREAKOUT', 'ACCUMULATION', 'DISTRIBUTION'],
+            default='NEUTRAL'
+        )
         
         # 상태 분류 (히트맵 색상용)
-        if short_z >= 3.0:
-            status = 'extreme'
-        elif short_z >= 2.0:
-            status = 'hot'
-        elif short_z >= 1.0:
-            status = 'warm'
-        elif short_z >= 0:
-            status = 'active'
-        elif short_z >= -1.0:
-            status = 'normal'
-        elif short_z >= -2.0:
-            status = 'cool'
-        else:
-            status = 'cold'
+        status = np.select(
+            [short_z >= 3.0, short_z >= 2.0, short_z >= 1.0, short_z >= 0, short_z >= -1.0, short_z >= -2.0],
+            ['extreme', 'hot', 'warm', 'active', 'normal', 'cool'],
+            default='cold'
+        )
         
         return signal, status
     
@@ -164,15 +217,22 @@ class SectorAggregator:
         """섹터별 Z-Score 기반 거래량 분석"""
         results = []
         
+        sector_df = df[df['Ticker'].isin(list(self.sectors))]
+        batch = self.calculate_volume_stats_batch(sector_df) if not sector_df.empty else pd.DataFrame()
+        
         for ticker, sector_name in self.sectors.items():
-            ticker_df = df[df['Ticker'] == ticker].copy()
-            
-            if ticker_df.empty:
+            if ticker not in batch.index:
                 logger.warning(f"{ticker} 데이터 없음")
                 continue
             
-            # 통계 계산
-            stats = self.calculate_volume_stats(ticker_df)
+            row = batch.loc[ticker]
+            stats = {
+                key: round(float(row[key]), 1 if key == 'percentile' else 2)
+                for key in (
+                    'short_zscore', 'medium_zscore', 'long_zscore',
+                    'short_spike', 'medium_spike', 'long_spike', 'percentile'
+                )
+            }
             
             # 시그널 분류
             signal, status = self.classify_signal(stats)
@@ -228,3 +288,110 @@ class SectorAggregator:
             'signals': signal_counts,
             'sectors': sectors_data
         }
+    
+    def calculate_signal_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        날짜별 Z-Score / 시그널 시계열
+        
+        각 날짜에서 그 날까지의 데이터만으로 calculate_volume_stats를 계산한
+        것과 같은 값을 rolling mean/std/rank로 한 번에 구한다 (티커당 O(n)).
+        
+        Returns:
+            Date, Ticker, short/medium/long_zscore, percentile, signal, status
+        """
+        df = df[df['Ticker'].isin(list(self.sectors))].sort_values(['Ticker', 'Date'], kind='stable')
+        
+        # (티커 내 순번 × 티커) 패널 - rolling이 열 단위로 동작
+        layout = TickerPanel(df['Ticker'])
+        volume = pd.DataFrame(layout.to_panel(df['Volume'].to_numpy(dtype=float, na_value=np.nan)))
+        observed = np.arange(1, len(volume) + 1)[:, None]  # 각 시점까지의 관측 수
+        
+        result = pd.DataFrame({'Date': df['Date'].to_numpy(), 'Ticker': df['Ticker'].to_numpy()})
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name, period in (
+                ('short', self.short_period),
+                ('medium', self.medium_period),
+                ('long', self.long_period)
+            ):
+                rolling = volume.rolling(window=period, min_periods=1)
+                mean = rolling.mean().to_numpy()
+                std = rolling.std().to_numpy()
+                
+                zscore = (volume.to_numpy() - mean) / std
+                zscore = np.where((std == 0) | np.isnan(std), 0.0, zscore)
+                zscore = np.where(np.minimum(period, observed) < 5, 0.0, zscore)
+                result[f'{name}_zscore'] = np.round(layout.to_rows(zscore), 2)
+            
+            # 장기 백분위: 윈도우 내 현재값보다 작은 값의 비율
+            rank = volume.rolling(window=self.long_period, min_periods=1).rank(method='min').to_numpy()
+            percentile = (rank - 1) / np.minimum(self.long_period, observed) * 100
+            result['percentile'] = np.round(layout.to_rows(percentile), 1)
+        
+        result['signal'], result['status'] = self.classify_signals(
+            result['short_zscore'].to_numpy(),
+            result['long_zscore'].to_numpy()
+        )
+        
+        return result
+    
+    def get_signal_history(self, df: pd.DataFrame, days: int = 60) -> Dict:
+        """
+        섹터 히트맵 재생용 시계열 요약
+        
+        Args:
+            df: 섹터 ETF OHLCV DataFrame
+            days: 반환할 최근 거래일 수
+        
+        Returns:
+            {
+                'dates': [...],
+                'sectors': [
+                    {'sector', 'ticker', 'short_zscore': [...], ..., 'signal': [...],
+                     'status': [...], 'last_flip': {'date', 'signal'} | None}
+                ]
+            }
+        """
+        history = self.calculate_signal_history(df)
+        
+        # 시그널이 바뀐 시점 (티커 첫 봉 제외)
+        same_ticker = history['Ticker'].eq(history['Ticker'].shift())
+        flipped = same_ticker & history['signal'].ne(history['signal'].shift())
+        last_flips = history[flipped].groupby('Ticker', observed=True).tail(1).set_index('Ticker')
+        
+        dates = history['Date'].drop_duplicates().sort_values().tail(days)
+        recent = history[history['Date'] >= dates.iloc[0]] if not dates.empty else history
+        
+        sectors = []
+        for ticker, sector_name in self.sectors.items():
+            ticker_df = recent[recent['Ticker'] == ticker]
+            if ticker_df.empty:
+                continue
+            
+            last_flip = None
+            if ticker in last_flips.index:
+                flip = last_flips.loc[ticker]
+                last_flip = {'date': flip['Date'].strftime('%Y-%m-%d'), 'signal': flip['signal']}
+            
+            sectors.append({
+                'sector': sector_name,
+                'ticker': ticker,
+                'dates': ticker_df['Date'].dt.strftime('%Y-%m-%d').tolist(),
+                'short_zscore': _float_list(ticker_df['short_zscore']),
+                'medium_zscore': _float_list(ticker_df['medium_zscore']),
+                'long_zscore': _float_list(ticker_df['long_zscore']),
+                'percentile': _float_list(ticker_df['percentile']),
+                'signal': ticker_df['signal'].tolist(),
+                'status': ticker_df['status'].tolist(),
+                'last_flip': last_flip
+            })
+        
+        return {
+            'dates': dates.dt.strftime('%Y-%m-%d').tolist(),
+            'sectors': sectors
+        }
+
+
+def _float_list(series: pd.Series) -> List:
+    """float 시리즈 → JSON용 리스트 (NaN은 None)"""
+    return [None if np.isnan(v) else v for v in series.tolist()]
@@ -0,0 +1,46 @@
+"""
+(관측 순번 × 티커) 2차원 패널
+Ticker, Date 정렬된 긴 형태 DataFrame의 컬럼을 티커별 열로 펼쳐서
+rolling/누적합 계산을 전 티커에 대해 한 번에 하고, 결과를 다시 행 순서로 되돌린다.
+"""
+import numpy as np
+import pandas as pd
+
+
+class TickerPanel:
+    """
+    행 ↔ 패널 위치 매핑
+
+    날짜가 아닌 티커 내 순번으로 배치하므로 티커마다 거래일/길이가 달라도 된다.
+    빈 칸은 NaN.
+    """
+
+    def __init__(self, ticker: pd.Series, align: str = "start"):
+        """
+        Args:
+            ticker: Ticker 컬럼 (같은 티커 행이 연속, 티커 내 시간순)
+            align: start = 첫 봉을 첫 행에 (rolling 계산용),
+                end = 마지막 봉을 마지막 행에 (최근 N개 꼬리 구간 통계용)
+        """
+        if align not in ("start", "end"):
+            raise ValueError(f"알 수 없는 align: {align}")
+
+        self.codes, self.tickers = pd.factorize(ticker)
+        self.lengths = np.bincount(self.codes, minlength=len(self.tickers))
+        depth = self.lengths.max() if len(self.lengths) else 0
+
+        starts = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+        self.rows = np.arange(len(self.codes)) - starts[self.codes]
+        if align == "end":
+            self.rows += depth - self.lengths[self.codes]
+        self.shape = (depth, len(self.lengths))
+
+    def to_panel(self, values: np.ndarray) -> np.ndarray:
+        """행 값 배열 → (depth × 티커) float 패널"""
+        panel = np.full(self.shape, np.nan)
+        panel[self.rows, self.codes] = values
+        return panel
+
+    def to_rows(self, panel: np.ndarray) -> np.ndarray:
+        """패널 → 원래 행 순서 값 배열"""
+        return panel[self.rows, self.codes]
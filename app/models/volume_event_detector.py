@@ -2,28 +2,159 @@
 거래량 이벤트 탐지 엔진
 전일 대비, 이동평균 대비 거래량 급등/급락 감지
 """
+from collections import deque
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 import logging
 
+from models.ticker_panel import TickerPanel
+from services.serialization import frame_to_records
+
 logger = logging.getLogger(__name__)
 
+# 이벤트 레벨 (낮은 순, Categorical 코드 순서)
+EVENT_LEVELS = ['ALERT', 'MEDIUM', 'HIGH', 'EXTREME']
+TOP_SPIKE_COLUMNS = [
+    'Date', 'Ticker', 'Close', 'Volume', 'Volume_MA',
+    'Volume_Spike_Ratio', 'Volume_Change_Pct', 'Price_Change_Pct'
+]
+
+
+def _rolling_mean(panel: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """
+    열별 이동평균 (누적합 윈도우, NaN 무시)
+    
+    누적합 자릿수 오차를 줄이기 위해 열 평균을 뺀 값으로 누적한다.
+    """
+    valid = ~np.isnan(panel)
+    with np.errstate(invalid='ignore'):
+        center = np.nanmean(panel, axis=0) if panel.size else np.zeros(panel.shape[1])
+    center = np.nan_to_num(center)
+    
+    zeros = np.zeros((1, panel.shape[1]))
+    sums = np.concatenate((zeros, np.cumsum(np.where(valid, panel - center, 0.0), axis=0)))
+    counts = np.concatenate((zeros, np.cumsum(valid, axis=0)))
+    
+    end = np.arange(1, panel.shape[0] + 1)
+    start = np.maximum(end - window, 0)
+    window_sum = sums[end] - sums[start]
+    window_count = counts[end] - counts[start]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = window_sum / window_count + center
+    return np.where(window_count >= min_periods, mean, np.nan)
+
+
+def _pct_change(panel: np.ndarray) -> np.ndarray:
+    """열별 직전 관측 대비 변화율 (첫 행은 NaN)"""
+    change = np.full(panel.shape, np.nan)
+    change[1:] = panel[1:] / panel[:-1] - 1
+    return change
+
+class VolumeState:
+    """
+    티커별 증분 거래량 상태
+    
+    최근 ma_period개 거래량의 링 버퍼와 누적합, 직전 봉 거래량/종가만 보관하므로
+    새 봉 1개 반영이 히스토리 길이와 무관하게 O(1).
+    같은 날짜의 봉이 다시 들어오면 (장중 갱신) 마지막 봉을 교체한다.
+    거래량 NaN 봉은 배치 이동평균과 같이 윈도우 자리만 차지하고 합계/개수에서 제외한다.
+    """
+    
+    def __init__(self, ticker: str, ma_period: int = 20, min_periods: int = 5):
+        self.ticker = ticker
+        self.ma_period = ma_period
+        self.min_periods = min_periods
+        self.window = deque(maxlen=ma_period)
+        self.window_sum = 0.0
+        self.window_count = 0  # 윈도우 내 NaN이 아닌 거래량 수
+        self.last_date = None
+        self.last_volume = None
+        self.last_close = None
+        # 마지막 봉 교체 시 변화율 기준이 되는 그 이전 봉
+        self.prev_volume = None
+        self.prev_close = None
+        self.latest: Optional[Dict] = None  # 마지막 update() 결과
+    
+    def _add(self, volume: float, sign: int) -> None:
+        if not np.isnan(volume):
+            self.window_sum += sign * volume
+            self.window_count += sign
+    
+    def update(self, date, close: float, volume: float) -> Dict:
+        """
+        봉 1개 반영
+        
+        Returns:
+            calculate_volume_features와 같은 컬럼의 최신 봉 특성
+        """
+        volume = float(volume)
+        close = float(close)
+        
+        if self.last_date is not None and date == self.last_date:
+            # 장중 갱신: 마지막 봉 교체
+            self._add(self.window[-1], -1)
+            self.window[-1] = volume
+        else:
+            if len(self.window) == self.ma_period:
+                self._add(self.window[0], -1)
+            self.window.append(volume)
+            self.prev_volume = self.last_volume
+            self.prev_close = self.last_close
+        self._add(volume, 1)
+        
+        self.last_date = date
+        self.last_volume = volume
+        self.last_close = close
+        
+        volume_ma = (
+            self.window_sum / self.window_count
+            if self.window_count >= self.min_periods else np.nan
+        )
+        
+        self.latest = {
+            'Date': date,
+            'Ticker': self.ticker,
+            'Close': close,
+            'Volume': volume,
+            'Volume_MA': volume_ma,
+            'Volume_Spike_Ratio': volume / volume_ma if volume_ma else np.nan,
+            'Volume_Change_Pct': _change_pct(volume, self.prev_volume),
+            'Price_Change_Pct': _change_pct(close, self.prev_close)
+        }
+        return self.latest
+
+
+def _change_pct(current: float, previous: Optional[float]) -> float:
+    if previous is None or previous == 0 or pd.isna(previous):
+        return np.nan
+    return (current / previous - 1) * 100
+
+
 class VolumeEventDetector:
     """거래량 이상징후 탐지기"""
     
     def __init__(
         self, 
         ma_period: int = 20,
-        thresholds: Dict[str, float] = None
+        thresholds: Dict[str, float] = None,
+        engine: str = "panel"
     ):
         """
         Args:
             ma_period: 이동평균 기간 (기본 20일)
             thresholds: 임계값 딕셔너리
+            engine: 특성 계산 엔진
+                - panel: 티커를 열로 하는 2차원 배열에서 전 티커 동시 계산 (기본)
+                - groupby: 티커별 groupby 계산 (기준 구현)
         """
+        if engine not in ('panel', 'groupby'):
+            raise ValueError(f"알 수 없는 engine: {engine}")
+        
         self.ma_period = ma_period
+        self.engine = engine
         self.thresholds = thresholds or {
             "extreme": 2.5,
             "high": 2.0,
@@ -44,11 +175,16 @@ class VolumeEventDetector:
         Returns:
             Enhanced DataFrame with volume features
         """
-        df = df.copy()
         df = df.sort_values(['Ticker', 'Date'])
         
+        if self.engine == 'groupby':
+            return self._features_groupby(df)
+        return self._features_panel(df)
+    
+    def _features_groupby(self, df: pd.DataFrame) -> pd.DataFrame:
+        """티커별 groupby 기반 특성 계산 (df는 Ticker, Date 정렬 상태)"""
         # 거래량 이동평균
-        df['Volume_MA'] = df.groupby('Ticker')['Volume'].transform(
+        df['Volume_MA'] = df.groupby('Ticker', observed=True)['Volume'].transform(
             lambda x: x.rolling(window=self.ma_period, min_periods=5).mean()
         )
         
@@ -56,13 +192,115 @@ class VolumeEventDetector:
         df['Volume_Spike_Ratio'] = df['Volume'] / df['Volume_MA']
         
         # 전일 대비 거래량 변화율
-        df['Volume_Change_Pct'] = df.groupby('Ticker')['Volume'].pct_change() * 100
+        df['Volume_Change_Pct'] = df.groupby('Ticker', observed=True)['Volume'].pct_change() * 100
         
         # 가격 변화율
-        df['Price_Change_Pct'] = df.groupby('Ticker')['Close'].pct_change() * 100
+        # 가격 dtype과 무관하게 변화율은 float64로 계산 (panel 엔진과 동일)
+        df['Price_Change_Pct'] = df['Close'].astype(float).groupby(df['Ticker'], observed=True).pct_change() * 100
+        
+        return df
+    
+    def _features_panel(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        2차원 패널 기반 특성 계산 (df는 Ticker, Date 정렬 상태)
+        
+        각 티커의 관측치를 순서대로 한 열에 쌓은 (관측 순번 × 티커) 배열을 만들어
+        누적합 윈도우로 전 티커의 이동평균/변화율을 한 번에 계산한다.
+        날짜가 아닌 티커 내 순번으로 정렬하므로 티커마다 거래일이 달라도
+        groupby 결과와 같다.
+        """
+        layout = TickerPanel(df['Ticker'])
+        volume = layout.to_panel(df['Volume'].to_numpy(dtype=float, na_value=np.nan))
+        close = layout.to_panel(df['Close'].to_numpy(dtype=float, na_value=np.nan))
+        
+        volume_ma = _rolling_mean(volume, self.ma_period, min_periods=5)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_change = _pct_change(volume) * 100
+            price_change = _pct_change(close) * 100
+        
+        df['Volume_MA'] = layout.to_rows(volume_ma)
+        df['Volume_Spike_Ratio'] = df['Volume'] / df['Volume_MA']
+        df['Volume_Change_Pct'] = layout.to_rows(volume_change)
+        df['Price_Change_Pct'] = layout.to_rows(price_change)
         
         return df
     
+    def classify_events(self, spike_ratio: pd.Series) -> pd.Series:
+        """
+        스파이크 비율 → 이벤트 레벨 (벡터화)
+        
+        임계값 미만이거나 NaN이면 결측값.
+        
+        Args:
+            spike_ratio: Volume_Spike_Ratio 시리즈
+        
+        Returns:
+            EVENT_LEVELS 순서의 ordered Categorical 시리즈
+        """
+        codes = self._level_codes(spike_ratio.to_numpy(dtype=float, na_value=np.nan))
+        levels = pd.Categorical.from_codes(codes, categories=EVENT_LEVELS, ordered=True)
+        return pd.Series(levels, index=spike_ratio.index, name='Event_Level')
+    
+    def _level_codes(self, ratio: np.ndarray) -> np.ndarray:
+        """스파이크 비율 배열 → EVENT_LEVELS 코드 (임계값 미만/NaN은 -1)"""
+        return np.select(
+            [
+                ratio >= self.thresholds['extreme'],
+                ratio >= self.thresholds['high'],
+                ratio >= self.thresholds['medium'],
+                ratio >= self.thresholds['alert']
+            ],
+            [3, 2, 1, 0],
+            default=-1
+        )
+    
+    def event_level(self, spike_ratio: float) -> Optional[str]:
+        """스파이크 비율 1개 → 이벤트 레벨 (classify_events와 같은 임계값 비교)"""
+        code = self._level_codes(np.array([spike_ratio], dtype=float))[0]
+        return EVENT_LEVELS[code] if code >= 0 else None
+    
+    def build_state(self, ticker_df: pd.DataFrame, ticker: Optional[str] = None) -> VolumeState:
+        """
+        히스토리로 증분 상태 초기화
+        
+        Args:
+            ticker_df: 단일 티커 OHLCV (Date, Close, Volume)
+            ticker: 티커 (None이면 ticker_df['Ticker'] 사용)
+        """
+        if ticker is None:
+            ticker = ticker_df['Ticker'].iloc[0]
+        
+        state = VolumeState(ticker, ma_period=self.ma_period)
+        # 변화율 계산에 직전 봉이 필요하므로 윈도우보다 1개 더
+        recent = ticker_df.sort_values('Date').tail(self.ma_period + 1)
+        for date, close, volume in zip(recent['Date'], recent['Close'], recent['Volume']):
+            state.update(date, close, volume)
+        
+        return state
+    
+    def update_state(self, state: VolumeState, date, close: float, volume: float) -> Dict:
+        """
+        새 봉 1개로 상태 갱신 (O(1))
+        
+        Returns:
+            최신 봉 특성 + Event_Level
+        """
+        state.update(date, close, volume)
+        return self.state_row(state)
+    
+    def state_row(self, state: VolumeState) -> Dict:
+        """상태의 최신 봉 특성 + Event_Level"""
+        row = dict(state.latest)
+        row['Event_Level'] = self.event_level(row['Volume_Spike_Ratio'])
+        return row
+    
+    def classify_price_direction(self, price_change_pct: pd.Series) -> pd.Series:
+        """가격 변화율 → UP / DOWN / NEUTRAL (±0.5% 기준, 벡터화)"""
+        change = price_change_pct.to_numpy(dtype=float, na_value=np.nan)
+        direction = np.select([change > 0.5, change < -0.5], ['UP', 'DOWN'], default='NEUTRAL')
+        return pd.Series(direction, index=price_change_pct.index, name='Price_Direction')
+    
     def detect_events(
         self, 
         df: pd.DataFrame,
@@ -78,39 +316,20 @@ class VolumeEventDetector:
         Returns:
             DataFrame with detected events
         """
-        df = df.copy()
-        
         # 최근 데이터만 필터링
         cutoff_date = df['Date'].max() - pd.Timedelta(days=recent_days)
-        recent_df = df[df['Date'] >= cutoff_date].copy()
+        recent_df = df[df['Date'] >= cutoff_date]
         
         # 이벤트 레벨 분류 (아직 없는 경우에만)
         if 'Event_Level' not in recent_df.columns:
-            def classify_event(ratio):
-                if pd.isna(ratio):
-                    return None
-                if ratio >= self.thresholds['extreme']:
-                    return 'EXTREME'
-                elif ratio >= self.thresholds['high']:
-                    return 'HIGH'
-                elif ratio >= self.thresholds['medium']:
-                    return 'MEDIUM'
-                elif ratio >= self.thresholds['alert']:
-                    return 'ALERT'
-                return None
-            
-            recent_df['Event_Level'] = recent_df['Volume_Spike_Ratio'].apply(classify_event)
-        
-        # 이벤트만 필터링
-        events = recent_df[recent_df['Event_Level'].notna()].copy()
-        
-        # 이벤트 메타데이터 추가
-        events['Event_Type'] = 'VOLUME_SPIKE'
-        events['Detected_At'] = datetime.now().isoformat()
-        
-        # 가격 반응 분석
-        events['Price_Direction'] = events['Price_Change_Pct'].apply(
-            lambda x: 'UP' if x > 0.5 else ('DOWN' if x < -0.5 else 'NEUTRAL')
+            recent_df = recent_df.assign(Event_Level=self.classify_events(recent_df['Volume_Spike_Ratio']))
+        
+        # 이벤트만 필터링 + 메타데이터, 가격 반응 분석
+        events = recent_df[recent_df['Event_Level'].notna()]
+        events = events.assign(
+            Event_Type='VOLUME_SPIKE',
+            Detected_At=datetime.now().isoformat(),
+            Price_Direction=self.classify_price_direction(events['Price_Change_Pct'])
         )
         
         logger.info(f"총 {len(events)}개 이벤트 탐지 (최근 {recent_days}일)")
@@ -139,8 +358,16 @@ class VolumeEventDetector:
         
         summary = {
             'total_events': len(events),
-            'by_level': events['Event_Level'].value_counts().to_dict(),
-            'by_ticker': events['Ticker'].value_counts().to_dict(),
+            'by_level': {
+                str(level): int(count)
+                for level, count in events['Event_Level'].value_counts().items()
+                if count > 0
+            },
+            'by_ticker': {
+                str(ticker): int(count)
+                for ticker, count in events['Ticker'].value_counts().items()
+                if count > 0  # categorical이면 이벤트 없는 티커도 0으로 포함됨
+            },
             'date_range': {
                 'start': events['Date'].min().strftime('%Y-%m-%d'),
                 'end': events['Date'].max().strftime('%Y-%m-%d')
@@ -151,10 +378,9 @@ class VolumeEventDetector:
         latest = events.nlargest(10, 'Date')[
             ['Date', 'Ticker', 'Event_Level', 'Volume_Spike_Ratio', 
              'Volume_Change_Pct', 'Price_Change_Pct', 'Price_Direction']
-        ].copy()
+        ]
         
-        latest['Date'] = latest['Date'].dt.strftime('%Y-%m-%d')
-        summary['latest_events'] = latest.to_dict('records')
+        summary['latest_events'] = frame_to_records(latest, '%Y-%m-%d')
         
         return summary
     
@@ -178,7 +404,7 @@ class VolumeEventDetector:
                 'recent_events': list
             }
         """
-        ticker_df = df[df['Ticker'] == ticker].copy()
+        ticker_df = df[df['Ticker'] == ticker]
         
         if ticker_df.empty:
             return None
@@ -205,10 +431,7 @@ class VolumeEventDetector:
         # recent_events의 Date를 문자열로 변환
         events_list = []
         if not recent_events.empty:
-            events_copy = recent_events.tail(5).copy()
-            if 'Date' in events_copy.columns:
-                events_copy['Date'] = events_copy['Date'].dt.strftime('%Y-%m-%d')
-            events_list = events_copy.to_dict('records')
+            events_list = frame_to_records(recent_events.tail(5), '%Y-%m-%d')
         
         analysis = {
             'ticker': ticker,
@@ -242,20 +465,11 @@ class VolumeEventDetector:
         Returns:
             List of top spike events
         """
-        temp_df = df.copy()
-        
         if min_date:
-            temp_df = temp_df[temp_df['Date'] >= min_date]
+            df = df[df['Date'] >= min_date]
         
         # 스파이크 비율 기준 정렬
-        top_spikes = temp_df.nlargest(top_n, 'Volume_Spike_Ratio')[
-            ['Date', 'Ticker', 'Close', 'Volume', 'Volume_MA', 
-             'Volume_Spike_Ratio', 'Volume_Change_Pct', 'Price_Change_Pct']
-        ].copy()
-        
-        # Date를 문자열로 변환
-        if 'Date' in top_spikes.columns:
-            top_spikes['Date'] = pd.to_datetime(top_spikes['Date']).dt.strftime('%Y-%m-%d')
+        top_spikes = df.nlargest(top_n, 'Volume_Spike_Ratio')[TOP_SPIKE_COLUMNS]
         
-        return top_spikes.to_dict('records')
+        return frame_to_records(top_spikes, '%Y-%m-%d')
 
@@ -0,0 +1,79 @@
+"""
+시계열 다운샘플링 모듈
+차트가 그릴 수 있는 포인트 수로 긴 히스토리를 축소
+- 가격: LTTB (Largest-Triangle-Three-Buckets) - 형태 보존
+- 거래량: 구간 최대값 - 스파이크 보존
+"""
+import numpy as np
+
+
+def lttb_indices(y: np.ndarray, n: int) -> np.ndarray:
+    """
+    LTTB 다운샘플링 인덱스
+
+    첫/마지막 포인트를 고정하고, 나머지를 n-2개 버킷으로 나눠 각 버킷에서
+    (이전 선택점, 현재 후보, 다음 버킷 평균)이 만드는 삼각형 넓이가 가장 큰
+    포인트를 고른다. x축은 관측 순번.
+
+    Args:
+        y: 값 배열 (NaN은 평균으로 대체해서 계산)
+        n: 목표 포인트 수
+
+    Returns:
+        선택된 인덱스 (오름차순, 길이 min(n, len(y)))
+    """
+    size = len(y)
+    if n >= size:
+        return np.arange(size)
+    if n < 3:
+        return np.array([0, size - 1])[:max(n, 0)]
+
+    y = np.asarray(y, dtype=float)
+    if np.isnan(y).any():
+        y = np.where(np.isnan(y), np.nanmean(y), y)
+
+    # 첫 포인트(0)와 마지막 포인트(size-1) 사이를 n-2개 버킷으로
+    edges = np.floor(np.linspace(1, size - 1, n - 1)).astype(int)
+    selected = np.empty(n, dtype=int)
+    selected[0] = 0
+    selected[-1] = size - 1
+
+    prev = 0
+    for i in range(n - 2):
+        start, end = edges[i], edges[i + 1]
+
+        if i < n - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = size - 1, size
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = y[next_start:next_end].mean()
+
+        xs = np.arange(start, end)
+        area = np.abs((prev - avg_x) * (y[start:end] - y[prev]) - (prev - xs) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+
+    return selected
+
+
+def segment_starts(indices: np.ndarray, size: int) -> np.ndarray:
+    """
+    선택 인덱스별 담당 구간 시작점
+
+    인접한 선택점 사이의 중간에서 구간을 나눈다. 구간들은 [0, size)를 빈틈없이 덮는다.
+    """
+    starts = np.empty(len(indices), dtype=int)
+    starts[0] = 0
+    starts[1:] = (indices[:-1] + indices[1:] + 1) // 2
+    return starts
+
+
+def bucket_max(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """구간별 최대값 (NaN 무시, 구간 전체가 NaN이면 NaN)"""
+    return np.fmax.reduceat(np.asarray(values, dtype=float), starts)
+
+
+def bucket_min(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """구간별 최소값 (NaN 무시, 구간 전체가 NaN이면 NaN)"""
+    return np.fmin.reduceat(np.asarray(values, dtype=float), starts)
@@ -0,0 +1,70 @@
+"""
+분석 작업 실행 풀
+async 엔드포인트에서 동기 수집/분석 코드를 이벤트 루프 밖에서 실행
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """실행 중 + 대기 중 작업 수가 한도에 도달"""
+
+
+class WorkerPool:
+    """
+    동기 작업용 스레드 풀
+
+    - max_workers개 스레드에서 동시에 실행, 최대 max_queue개까지 대기
+    - 한도를 넘는 요청은 대기열에 쌓지 않고 즉시 PoolSaturated (→ 503)
+    - 프로세스 풀이 아닌 이유: 수집기/분석기 캐시를 모든 요청이 공유해야 하고,
+      yfinance I/O와 pandas/numpy 연산 대부분이 GIL을 놓는다
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 32):
+        """
+        Args:
+            max_workers: 동시 실행 스레드 수
+            max_queue: 실행 대기 최대 작업 수
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="analysis"
+        )
+        self._pending = 0  # 이벤트 루프 스레드에서만 변경
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        fn(*args, **kwargs)를 풀에서 실행하고 결과 대기
+
+        Raises:
+            PoolSaturated: 실행 + 대기 작업 수가 한도 초과
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            logger.warning(f"작업 풀 포화: {self._pending}개 처리 중")
+            raise PoolSaturated("서버가 바쁩니다. 잠시 후 다시 시도하세요.")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> Dict:
+        """풀 상태"""
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'pending': self._pending
+        }
+
+    def shutdown(self) -> None:
+        """풀 종료 (실행 중인 작업은 완료 대기)"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,173 @@
+"""
+HTTP 응답 캐시
+ETag + If-None-Match → 304, gzip/brotli 압축 본문을 데이터 버전별로 캐시
+"""
+import gzip
+import hashlib
+from typing import Any, Hashable, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+
+from models.data_cache import DataFrameCache
+from services.metrics import RESPONSE_CACHE_RESULTS, STAGE_SECONDS
+from services.serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 gzip만 사용
+    brotli = None
+
+
+def make_etag(body: bytes) -> str:
+    """
+    본문 해시 기반 ETag
+
+    인코딩(gzip/br/identity)과 무관하게 같은 JSON이면 같은 값이 되도록 weak ETag 사용
+    """
+    return 'W/"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 (weak 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Accept-Encoding → br | gzip | identity (q=0은 거부로 처리)"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return 'identity'
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """본문 압축"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def _entry_size(entry: tuple) -> int:
+    return len(entry[1])
+
+
+class ResponseCache:
+    """
+    인코딩된 응답 본문 캐시
+
+    - key: 응답 내용을 결정하는 값 (엔드포인트, 파라미터, 데이터 버전 등).
+      같은 key면 다시 계산/직렬화하지 않고, If-None-Match가 맞으면 본문 없이 304
+    - 압축 본문은 ETag(본문 해시) + 인코딩별로 캐시해서 한 번만 압축
+    - key가 None이면 캐시하지 않고 응답만 생성 (ETag/압축은 동일하게 적용)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 128,
+        max_bytes: int = 64 * 1024 * 1024,
+        min_size: int = 1024
+    ):
+        """
+        Args:
+            ttl: 항목 유효 시간 (초)
+            max_entries: 최대 항목 수 (본문 + 압축 본문)
+            max_bytes: 최대 본문 bytes
+            min_size: 압축할 최소 본문 크기 (bytes)
+        """
+        self.min_size = min_size
+        self._cache = DataFrameCache(
+            ttl=ttl,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            sizeof=_entry_size
+        )
+
+    def lookup(self, key: Optional[Hashable]) -> Optional[Tuple[str, bytes]]:
+        """key에 해당하는 (ETag, 본문) (없으면 None)"""
+        if key is None:
+            return None
+        entry = self._cache.get(('body', key))
+        if entry is None:
+            RESPONSE_CACHE_RESULTS.inc(result='miss')
+        return entry
+
+    def respond_cached(
+        self,
+        request: Request,
+        entry: Tuple[str, bytes],
+        allow_compress: bool = True
+    ) -> Optional[Response]:
+        """
+        lookup으로 찾은 본문 응답
+
+        Args:
+            allow_compress: False면 압축본이 캐시에 없을 때 압축하지 않고 None 반환
+                (이벤트 루프에서는 False로 호출하고, None이면 작업 풀에서 다시 호출)
+        """
+        response = self._respond(request, *entry, allow_compress=allow_compress)
+        if response is not None and response.status_code != 304:
+            RESPONSE_CACHE_RESULTS.inc(result='hit')
+        return response
+
+    def render(self, request: Request, key: Optional[Hashable], result: Any) -> Response:
+        """결과를 직렬화해서 응답하고 key로 캐시 (오류 결과는 캐시하지 않음)"""
+        with STAGE_SECONDS.time(stage='serialize'):
+            body = dumps(result)
+        etag = make_etag(body)
+        if key is not None and not (isinstance(result, dict) and result.get('error')):
+            self._cache.set(('body', key), (etag, body))
+        return self._respond(request, etag, body)
+
+    def _respond(
+        self,
+        request: Request,
+        etag: str,
+        body: bytes,
+        allow_compress: bool = True
+    ) -> Optional[Response]:
+        headers = {'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            RESPONSE_CACHE_RESULTS.inc(result='not_modified')
+            return Response(status_code=304, headers=headers)
+
+        encoding = 'identity'
+        if len(body) >= self.min_size:
+            encoding = choose_encoding(request.headers.get('accept-encoding'))
+
+        if encoding != 'identity':
+            entry = self._cache.get((encoding, etag))
+            if entry is None:
+                if not allow_compress:
+                    return None
+                with STAGE_SECONDS.time(stage='compress'):
+                    entry = (etag, compress(body, encoding))
+                self._cache.set((encoding, etag), entry)
+            body = entry[1]
+            headers['Content-Encoding'] = encoding
+
+        return Response(content=body, media_type='application/json', headers=headers)
+
+    def stats(self) -> dict:
+        """캐시 통계"""
+        return self._cache.stats()
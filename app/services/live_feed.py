@@ -0,0 +1,181 @@
+"""
+실시간 변경분 스트림 (Server-Sent Events)
+스케줄러가 게시한 빠른 스캔/섹터 결과를 이전 상태와 비교해서 바뀐 필드만 전파
+"""
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+import logging
+
+from services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# 채널별 행 키와 전파할 필드 (None이면 전체 필드)
+CHANNELS = {
+    'quick': ('ticker', None),
+    'sectors': ('ticker', ('sector', 'signal', 'status')),  # 분류 변화만
+}
+
+
+def quick_rows(result: Dict) -> List[Dict]:
+    """quick_scan 결과 → 행 리스트"""
+    return result.get('data', [])
+
+
+def sector_rows(result: Dict) -> List[Dict]:
+    """get_sector_summary 결과 → 행 리스트"""
+    return result.get('sectors', [])
+
+
+def diff_rows(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict:
+    """
+    행 단위 변경분
+
+    Returns:
+        {'upsert': {key: 바뀐 필드만 (새 행은 전체)}, 'remove': [key, ...]}
+        변경이 없으면 빈 dict
+    """
+    upsert = {}
+    for key, row in new.items():
+        previous = old.get(key)
+        if previous is None:
+            upsert[key] = row
+            continue
+        changed = {field: value for field, value in row.items() if previous.get(field) != value}
+        if changed:
+            upsert[key] = changed
+
+    remove = [key for key in old if key not in new]
+
+    diff = {}
+    if upsert:
+        diff['upsert'] = upsert
+    if remove:
+        diff['remove'] = remove
+    return diff
+
+
+class _Subscriber:
+    """클라이언트별 메시지 큐"""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+
+
+class LiveFeed:
+    """
+    변경분 팬아웃
+
+    - publish()가 채널 상태와 비교해서 변경분 메시지를 한 번만 인코딩하고
+      모든 구독자 큐에 같은 bytes를 넣는다 (클라이언트당 계산/직렬화 없음)
+    - 새 구독자는 현재 전체 상태(snapshot)부터 받는다
+    - 큐가 가득 찬 느린 클라이언트는 연결을 끊는다 (재연결 시 snapshot으로 복구)
+    - 이벤트 루프 스레드에서만 호출
+    """
+
+    def __init__(self, max_queue: int = 64, heartbeat: float = 15.0):
+        """
+        Args:
+            max_queue: 클라이언트별 미전송 메시지 한도
+            heartbeat: 변경이 없을 때 연결 유지용 주석 전송 간격 (초)
+        """
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._state: Dict[str, Dict[str, Dict]] = {channel: {} for channel in CHANNELS}
+        self._seq = 0
+        self._subscribers: Set[_Subscriber] = set()
+
+    def publish(self, channel: str, rows: List[Dict]) -> Optional[Dict]:
+        """
+        채널 새 상태 반영 및 변경분 전파
+
+        Args:
+            channel: CHANNELS 키
+            rows: 새 행 리스트
+
+        Returns:
+            전파한 메시지 (변경 없으면 None)
+        """
+        key_field, fields = CHANNELS[channel]
+        new = {
+            row[key_field]: row if fields is None else {field: row.get(field) for field in fields}
+            for row in rows
+        }
+        diff = diff_rows(self._state[channel], new)
+        self._state[channel] = new
+        if not diff:
+            return None
+
+        self._seq += 1
+        message = {'seq': self._seq, 'channel': channel, **diff}
+        frame = self._frame(channel, message)
+
+        for subscriber in list(self._subscribers):
+            self._offer(subscriber, frame)
+        return message
+
+    def on_publish(self, name: str, result: Any) -> None:
+        """RefreshScheduler 리스너 (quick/sectors 작업 결과 반영)"""
+        if name == 'quick':
+            self.publish('quick', quick_rows(result))
+        elif name == 'sectors':
+            self.publish('sectors', sector_rows(result))
+
+    def snapshot(self) -> Dict:
+        """전체 상태 메시지"""
+        return {'seq': self._seq, 'channels': self._state}
+
+    def subscribe(self) -> _Subscriber:
+        """구독 등록 (현재 snapshot을 첫 메시지로)"""
+        subscriber = _Subscriber(self.max_queue)
+        subscriber.queue.put_nowait(self._frame('snapshot', self.snapshot()))
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        """구독 해제"""
+        self._subscribers.discard(subscriber)
+
+    def _offer(self, subscriber: _Subscriber, frame: bytes) -> None:
+        try:
+            subscriber.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            logger.warning("느린 스트림 클라이언트 연결 종료")
+            self.unsubscribe(subscriber)
+            subscriber.closed = True
+            # 대기 메시지를 비우고 종료 신호
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(None)
+
+    def _frame(self, event: str, message: Dict) -> bytes:
+        """SSE 프레임 인코딩 (id/event/data)"""
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self._seq, event.encode(), dumps(message))
+
+    async def stream(self, is_disconnected: Callable[[], Any]) -> AsyncIterator[bytes]:
+        """
+        클라이언트 SSE 스트림
+
+        Args:
+            is_disconnected: 연결 종료 여부 확인 코루틴 함수 (Request.is_disconnected)
+        """
+        subscriber = self.subscribe()
+        try:
+            while not subscriber.closed:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict:
+        """구독 상태"""
+        return {'subscribers': len(self._subscribers), 'seq': self._seq}
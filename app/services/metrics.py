@@ -0,0 +1,187 @@
+"""
+성능 지표 모듈
+분석 단계/수집기 호출 소요 시간, 캐시 적중률을 Prometheus 텍스트 형식으로 노출
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (이름, 타입, 설명, [(라벨 dict, 값), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            samples = [(dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+        return [(self.name, 'counter', self.help, samples)]
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (초 단위 소요 시간)"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[tuple, list] = {}  # 라벨 → [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """with 블록 소요 시간 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> List[Family]:
+        buckets, sums, counts = [], [], []
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+
+        for key, state in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                buckets.append(({**labels, 'le': _format_value(float(bound))}, cumulative))
+            buckets.append(({**labels, 'le': '+Inf'}, state[-1]))
+            sums.append((labels, state[-2]))
+            counts.append((labels, state[-1]))
+
+        return [
+            (self.name, 'histogram', self.help, []),
+            (f'{self.name}_bucket', '', '', buckets),
+            (f'{self.name}_sum', '', '', sums),
+            (f'{self.name}_count', '', '', counts),
+        ]
+
+
+class Registry:
+    """지표 모음 + 조회 시점에 값을 만드는 수집 함수"""
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[Callable[[], List[Family]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[Family]]) -> None:
+        """조회 시 호출할 수집 함수 등록 (캐시 통계, 풀 상태 등)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        families: List[Family] = []
+        for metric in self._metrics:
+            families.extend(metric.collect())
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, kind, help, samples in families:
+            if kind:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def cache_families(stats_by_cache: Dict[str, Dict]) -> List[Family]:
+    """DataFrameCache.stats() 모음 → 캐시별 적중/미적중/축출/크기 지표"""
+    fields = [
+        ('hits', 'counter', '캐시 적중 수'),
+        ('misses', 'counter', '캐시 미적중 수'),
+        ('evictions', 'counter', 'LRU 축출 수'),
+        ('expirations', 'counter', 'TTL 만료 수'),
+        ('entries', 'gauge', '캐시 항목 수'),
+        ('bytes', 'gauge', '캐시 크기 (bytes)'),
+    ]
+    families = []
+    for field, kind, help in fields:
+        name = f'etf_cache_{field}_total' if kind == 'counter' else f'etf_cache_{field}'
+        samples = [({'cache': cache}, stats[field]) for cache, stats in stats_by_cache.items()]
+        families.append((name, kind, help, samples))
+    return families
+
+
+# 분석 파이프라인 단계 (features, classified, events, ..., serialize, compress)
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'etf_stage_seconds', '분석 단계별 소요 시간 (초)', ['stage']
+))
+# 수집기 공개 메서드 호출
+COLLECTOR_SECONDS = REGISTRY.register(Histogram(
+    'etf_collector_call_seconds', '수집기 호출 소요 시간 (초)', ['method']
+))
+# 데이터 소스 다운로드 (캐시/저장소 적중 시에는 기록되지 않음)
+UPSTREAM_SECONDS = REGISTRY.register(Histogram(
+    'etf_upstream_fetch_seconds', '데이터 소스 다운로드 소요 시간 (초)', ['source', 'ticker']
+))
+UPSTREAM_ERRORS = REGISTRY.register(Counter(
+    'etf_upstream_fetch_errors_total', '데이터 소스 다운로드 실패 수', ['source', 'ticker']
+))
+# HTTP 응답 캐시 (hit/miss: 키 조회 결과, not_modified: 304 응답)
+RESPONSE_CACHE_RESULTS = REGISTRY.register(Counter(
+    'etf_response_cache_total', 'HTTP 응답 캐시 조회 결과', ['result']
+))
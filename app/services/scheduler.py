@@ -0,0 +1,157 @@
+"""
+백그라운드 갱신 스케줄러
+빠른 스캔/섹터/전체 분석 결과를 주기적으로 미리 계산해서 게시
+"""
+import asyncio
+from datetime import datetime, time as dtime
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+import logging
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """미국 정규장 시간 여부 (평일 09:30~16:00 ET, 공휴일 미반영)"""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+class RefreshScheduler:
+    """
+    주기적 결과 갱신 + stale-while-revalidate 조회
+
+    - 장중에는 interval, 장외에는 off_hours_interval 주기로 모든 작업 갱신
+    - get()은 게시된 결과를 즉시 반환하고, 주기보다 오래되었으면
+      백그라운드 갱신을 예약한다 (응답은 기다리지 않음)
+    - max_stale보다 오래된 결과는 반환하지 않는다 (호출자가 직접 계산)
+    """
+
+    def __init__(
+        self,
+        jobs: Dict[str, Callable[[], Any]],
+        runner: Callable[..., Awaitable[Any]],
+        interval: float = 300,
+        off_hours_interval: float = 3600,
+        max_stale: Optional[float] = None
+    ):
+        """
+        Args:
+            jobs: 작업 이름 → 결과를 반환하는 동기 함수
+            runner: 동기 함수를 실행할 async 함수 (예: WorkerPool.run)
+            interval: 장중 갱신 주기 (초)
+            off_hours_interval: 장외 갱신 주기 (초)
+            max_stale: 게시 결과 최대 허용 나이 (초, None이면 off_hours_interval * 2)
+        """
+        self.jobs = jobs
+        self.runner = runner
+        self.interval = interval
+        self.off_hours_interval = off_hours_interval
+        self.max_stale = max_stale or off_hours_interval * 2
+
+        self._snapshots: Dict[str, tuple] = {}  # name -> (result, 게시 시각 monotonic, 게시 번호)
+        self._publish_seq = 0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[str, Any], None]] = []
+
+    def current_interval(self) -> float:
+        """현재 시각 기준 갱신 주기"""
+        return self.interval if is_market_open() else self.off_hours_interval
+
+    async def start(self) -> None:
+        """갱신 루프 시작 (첫 갱신은 즉시)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"갱신 스케줄러 시작: {list(self.jobs)}")
+
+    async def stop(self) -> None:
+        """갱신 루프 및 진행 중인 갱신 중지"""
+        tasks = [t for t in [self._task, *self._refreshing.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._refreshing.clear()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.refresh(name) for name in self.jobs))
+            await asyncio.sleep(self.current_interval())
+
+    def refresh(self, name: str) -> asyncio.Task:
+        """작업 갱신 예약 (이미 진행 중이면 그 작업을 반환)"""
+        task = self._refreshing.get(name)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(name))
+            self._refreshing[name] = task
+        return task
+
+    async def _refresh(self, name: str) -> None:
+        started = time.perf_counter()
+        try:
+            result = await self.runner(self.jobs[name])
+        except Exception as e:
+            logger.warning(f"{name} 갱신 실패: {e}")
+            return
+
+        if isinstance(result, dict) and result.get('error'):
+            logger.warning(f"{name} 갱신 결과 오류, 기존 결과 유지: {result.get('message')}")
+            return
+
+        self.publish(name, result)
+        logger.info(f"{name} 갱신 완료 ({time.perf_counter() - started:.2f}s)")
+
+    def add_listener(self, callback: Callable[[str, Any], None]) -> None:
+        """결과 게시 시 호출할 콜백 등록 (인자: 작업 이름, 결과, 이벤트 루프에서 호출)"""
+        self._listeners.append(callback)
+
+    def publish(self, name: str, result: Any) -> None:
+        """결과 게시"""
+        self._publish_seq += 1
+        self._snapshots[name] = (result, time.monotonic(), self._publish_seq)
+        for callback in self._listeners:
+            try:
+                callback(name, result)
+            except Exception as e:
+                logger.warning(f"결과 게시 콜백 실패: {e}")
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        게시된 결과 조회
+
+        Returns:
+            결과 (없거나 max_stale 초과 시 None). 갱신 주기가 지났으면
+            백그라운드 갱신을 예약하고 기존 결과를 그대로 반환한다.
+        """
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            return None
+
+        result, published_at, _ = snapshot
+        age = time.monotonic() - published_at
+
+        if age > self.current_interval():
+            self.refresh(name)
+        if age > self.max_stale:
+            return None
+
+        return result
+
+    def version(self, name: str) -> Optional[int]:
+        """게시 번호 (게시할 때마다 증가, 같은 번호면 같은 결과 객체)"""
+        snapshot = self._snapshots.get(name)
+        return snapshot[2] if snapshot else None
+
+    def status(self) -> Dict:
+        """작업별 게시 결과 나이 (초)"""
+        now = time.monotonic()
+        return {
+            name: round(now - snapshot[1], 1)
+            for name, snapshot in self._snapshots.items()
+        }
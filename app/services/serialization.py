@@ -0,0 +1,128 @@
+"""
+JSON 직렬화 모듈
+DataFrame → 컬럼 단위 변환, numpy/pandas 값을 포함한 응답을 JSON bytes로 인코딩
+"""
+from datetime import date, datetime
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from fastapi.responses import Response
+
+try:
+    import orjson
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME  # Timestamp/NaT는 _default에서 isoformat 처리
+    )
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+
+def column_values(series: pd.Series, date_format: Optional[str] = None) -> List:
+    """
+    시리즈 → 파이썬 기본 타입 리스트 (NaN/NaT → None)
+
+    행 단위 변환 없이 dtype별로 한 번에 변환한다.
+
+    Args:
+        series: 변환할 컬럼
+        date_format: datetime 컬럼 포맷 (None이면 isoformat)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        if date_format:
+            return series.dt.strftime(date_format).astype(object).where(series.notna(), None).tolist()
+        return [None if pd.isna(ts) else ts.isoformat() for ts in series.tolist()]
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        array = series.to_numpy(dtype=float, na_value=np.nan)
+        if series.dtype == np.float32:
+            # float32 값을 그대로 올리면 239.47 → 239.47000122070312, 최단 표현으로 변환
+            array = series.to_numpy().astype(str).astype(float)
+        values = array.tolist()
+        for i in np.flatnonzero(np.isnan(array)):
+            values[i] = None
+        return values
+
+    if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        if not series.hasnans:
+            return series.tolist()
+
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def to_float(value: Any) -> Optional[float]:
+    """스칼라 → float (NaN → None, float32는 최단 표현으로)"""
+    if pd.isna(value):
+        return None
+    if isinstance(value, np.float32):
+        return float(str(value))
+    return float(value)
+
+
+def frame_to_records(df: pd.DataFrame, date_format: Optional[str] = None) -> List[Dict]:
+    """DataFrame → records 리스트 (to_dict('records') + NaN 정리를 컬럼 단위로)"""
+    names = list(df.columns)
+    columns = [column_values(df[name], date_format) for name in names]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def frame_to_columns(df: pd.DataFrame, date_format: Optional[str] = None) -> Dict[str, List]:
+    """DataFrame → {컬럼: 값 리스트} (차트용 컬럼 지향 형태)"""
+    return {name: column_values(df[name], date_format) for name in df.columns}
+
+
+def _default(obj: Any) -> Any:
+    """기본 인코더가 처리하지 못하는 값 변환"""
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(obj) else obj.isoformat()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return to_float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    raise TypeError(f"JSON 직렬화 불가 타입: {type(obj).__name__}")
+
+
+def _sanitize(obj: Any) -> Any:
+    """표준 json 경로에서 NaN이 섞인 경우에만 쓰는 재귀 정리"""
+    if isinstance(obj, dict):
+        return {key: _sanitize(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(item) for item in obj]
+    if isinstance(obj, float) and np.isnan(obj):
+        return None
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    JSON bytes 인코딩
+
+    orjson이 있으면 numpy 배열/스칼라를 네이티브로 처리하고 NaN은 null로 출력한다.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    try:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    except ValueError:
+        text = json.dumps(_sanitize(obj), default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+class JSONBytesResponse(Response):
+    """dumps()로 인코딩하는 JSON 응답 (bytes 콘텐츠는 그대로 전송)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
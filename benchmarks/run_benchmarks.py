@@ -0,0 +1,267 @@
+"""
+거래량 분석 벤치마크
+합성 OHLCV 패널(티커 × 거래일)로 탐지기/섹터 집계기/전체 파이프라인 소요 시간 측정
+
+사용법 (저장소 루트에서):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 14x252,5000x2520 --repeat 3
+    python benchmarks/run_benchmarks.py --only features,detect_events --engine groupby
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1000x2520 --only full_pipeline,full_pipeline_sharded
+
+- 각 벤치마크는 repeat회 실행한 소요 시간의 중앙값/최소값을 기록하고,
+  별도 1회 실행을 tracemalloc으로 추적해서 최대 메모리 사용량을 기록한다
+- full_pipeline은 항상 단일 프로세스로 실행한다. 프로세스 샤딩은 full_pipeline_sharded로
+  따로 측정하며 (기본 목록에는 없음), 워커 캐시를 비울 수 없으므로 매번 force_refresh로
+  합성 데이터 생성부터 측정하고 메모리는 워커 프로세스를 추적할 수 없어 기록하지 않는다
+- 결과는 JSON으로 저장 (기본 benchmarks/results/<시각>.json)
+"""
+import argparse
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "app"))
+
+# 전체 파이프라인이 네트워크/로컬 저장소 없이 합성 데이터를 쓰도록 설정 로드 전에 지정
+os.environ["DATA_SOURCE"] = "synthetic"
+os.environ["OHLCV_STORE_DIR"] = ""
+
+import logging
+logging.disable(logging.INFO)
+
+import numpy as np
+import pandas as pd
+
+from config.pandas_options import configure_pandas
+configure_pandas()
+
+from config.etf_universe import MA_PERIOD, VOLUME_SPIKE_THRESHOLDS, EVENT_HISTORY_DAYS, SHARD_WORKERS
+from models.data_sources import SyntheticSource, generate_synthetic_ohlcv
+from models.etf_analyzer import ETFAnalyzer
+from models.ohlcv_schema import compact_ohlcv, concat_tickers
+from models.sector_aggregator import SectorAggregator
+from models.volume_event_detector import VolumeEventDetector
+
+DEFAULT_SIZES = "14x252,100x1260,1000x2520"
+BENCHMARKS = [
+    'features', 'detect_events', 'find_top_spikes',
+    'analyze_ticker', 'aggregate_sectors', 'full_pipeline'
+]
+# 기본 목록에 없는 추가 벤치마크 (--only로 지정)
+EXTRA_BENCHMARKS = ['full_pipeline_sharded']
+# 워커 프로세스에서 실행되어 tracemalloc으로 메모리를 잴 수 없는 벤치마크
+MULTIPROCESS_BENCHMARKS = {'full_pipeline_sharded'}
+
+
+def parse_sizes(text: str) -> List[Tuple[int, int]]:
+    """'14x252,5000x2520' → [(14, 252), (5000, 2520)]"""
+    sizes = []
+    for part in text.split(','):
+        tickers, days = part.lower().split('x')
+        sizes.append((int(tickers), int(days)))
+    return sizes
+
+
+def synthetic_tickers(count: int) -> List[str]:
+    return [f"T{i:04d}" for i in range(count)]
+
+
+def build_panel(tickers: List[str], days: int, seed: int = 0) -> pd.DataFrame:
+    """fetch_multiple과 같은 형태의 합성 패널 (표준 스키마)"""
+    return concat_tickers({
+        ticker: compact_ohlcv(generate_synthetic_ohlcv(ticker, days=days, seed=seed).reset_index(), ticker)
+        for ticker in tickers
+    })
+
+
+def measure(fn: Callable[[], object], repeat: int, track_memory: bool = True) -> Dict:
+    """repeat회 소요 시간 + tracemalloc 최대 메모리 (1회)"""
+    fn()  # 워밍업 (지연 import, 캐시 등)
+
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = round(peak / 1024 / 1024, 2)
+
+    return {
+        'median_s': statistics.median(seconds),
+        'min_s': min(seconds),
+        'mean_s': statistics.fmean(seconds),
+        'peak_mb': peak_mb
+    }
+
+
+def make_cases(
+    tickers: List[str],
+    days: int,
+    engine: str,
+    seed: int
+) -> Tuple[Dict[str, Callable[[], object]], Callable[[], None]]:
+    """
+    벤치마크 이름 → 측정 대상 함수 (입력 데이터는 미리 준비)
+
+    Returns:
+        (측정 대상 함수 dict, 정리 함수 - 샤딩 프로세스 풀 종료)
+    """
+    raw = build_panel(tickers, days, seed)
+    detector = VolumeEventDetector(ma_period=MA_PERIOD, thresholds=VOLUME_SPIKE_THRESHOLDS, engine=engine)
+    features = detector.calculate_volume_features(raw)
+    classified = features.assign(Event_Level=detector.classify_events(features['Volume_Spike_Ratio']))
+    cutoff = classified['Date'].max() - pd.Timedelta(days=EVENT_HISTORY_DAYS)
+    analyzed = tickers[:5]
+
+    # 모든 합성 티커를 섹터로 취급 (기본 설정은 SECTOR_ETFS 11개만 집계)
+    aggregator = SectorAggregator()
+    aggregator.sectors = {ticker: ticker for ticker in tickers}
+
+    # 전체 파이프라인: 원본 데이터는 수집기 캐시에 두고 특성/결과 캐시만 비워서 계산 비용 측정
+    analyzer = ETFAnalyzer()
+    analyzer.detector = detector
+    analyzer.collector.source = SyntheticSource(days=days, seed=seed)
+    analyzer.run_full_pipeline(tickers=tickers, period="max", sharded=False)
+
+    def full_pipeline():
+        analyzer.result_cache.clear()
+        analyzer.feature_cache.clear()
+        return analyzer.run_full_pipeline(tickers=tickers, period="max", sharded=False)
+
+    # 프로세스 샤딩: 같은 소스/탐지기 설정을 워커에 전달, 수집(합성 데이터 생성)부터 측정
+    sharded = ETFAnalyzer(source=SyntheticSource(days=days, seed=seed), detector=detector)
+    sharded.shard_workers = max(SHARD_WORKERS, 2)
+
+    def full_pipeline_sharded():
+        return sharded.run_full_pipeline(tickers=tickers, period="max", force_refresh=True, sharded=True)
+
+    cases = {
+        'features': lambda: detector.calculate_volume_features(raw),
+        'detect_events': lambda: detector.detect_events(classified, recent_days=EVENT_HISTORY_DAYS),
+        'find_top_spikes': lambda: detector.find_top_spikes(classified, top_n=10, min_date=cutoff),
+        'analyze_ticker': lambda: [detector.analyze_ticker(classified, ticker) for ticker in analyzed],
+        'aggregate_sectors': lambda: aggregator.aggregate_sectors(features),
+        'full_pipeline': full_pipeline,
+        'full_pipeline_sharded': full_pipeline_sharded,
+    }
+    return cases, sharded.shutdown
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict], baseline_path: Path) -> None:
+    """기준 결과 대비 중앙값 비율 출력 (< 1.0이면 빨라짐)"""
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    previous = {(r['size'], r['benchmark']): r for r in baseline['results']}
+
+    print(f"\n기준: {baseline_path} (commit {baseline.get('git_commit')})")
+    print(f"{'size':>12} {'benchmark':>22} {'before':>10} {'after':>10} {'ratio':>7}")
+    for result in results:
+        before = previous.get((result['size'], result['benchmark']))
+        if before is None:
+            continue
+        ratio = result['median_s'] / before['median_s'] if before['median_s'] else float('nan')
+        print(
+            f"{result['size']:>12} {result['benchmark']:>22} "
+            f"{before['median_s']:>10.4f} {result['median_s']:>10.4f} {ratio:>7.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="합성 OHLCV 거래량 분석 벤치마크")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="티커x거래일 목록 (예: 14x252,5000x2520)")
+    parser.add_argument('--repeat', type=int, default=5, help="벤치마크별 반복 횟수")
+    parser.add_argument(
+        '--only', default=','.join(BENCHMARKS),
+        help=f"실행할 벤치마크 (쉼표 구분, 추가: {','.join(EXTRA_BENCHMARKS)})"
+    )
+    parser.add_argument('--engine', default='panel', choices=['panel', 'groupby'], help="거래량 특성 계산 엔진")
+    parser.add_argument('--seed', type=int, default=0, help="합성 데이터 시드")
+    parser.add_argument('--no-memory', action='store_true', help="tracemalloc 메모리 측정 생략")
+    parser.add_argument('--output', type=Path, default=None, help="결과 JSON 경로")
+    parser.add_argument('--compare', type=Path, default=None, help="비교할 기준 결과 JSON")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS) - set(EXTRA_BENCHMARKS)
+    if unknown:
+        parser.error(f"알 수 없는 벤치마크: {sorted(unknown)}")
+
+    results = []
+    print(f"{'size':>12} {'benchmark':>22} {'median_s':>10} {'min_s':>10} {'rows/s':>14} {'peak_mb':>9}")
+    for ticker_count, days in parse_sizes(args.sizes):
+        size = f"{ticker_count}x{days}"
+        tickers = synthetic_tickers(ticker_count)
+        cases, close = make_cases(tickers, days, args.engine, args.seed)
+        rows = ticker_count * days
+
+        for name in selected:
+            track_memory = not args.no_memory and name not in MULTIPROCESS_BENCHMARKS
+            stats = measure(cases[name], args.repeat, track_memory=track_memory)
+            result = {
+                'size': size,
+                'tickers': ticker_count,
+                'days': days,
+                'rows': rows,
+                'benchmark': name,
+                **stats,
+                'rows_per_s': rows / stats['median_s'] if stats['median_s'] else None
+            }
+            results.append(result)
+            print(
+                f"{size:>12} {name:>22} {stats['median_s']:>10.4f} {stats['min_s']:>10.4f} "
+                f"{result['rows_per_s']:>14,.0f} {stats['peak_mb'] if stats['peak_mb'] is not None else '-':>9}"
+            )
+        close()
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'engine': args.engine,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'shard_workers': max(SHARD_WORKERS, 2),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results
+    }
+
+    output = args.output or ROOT / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()